@@ -75,8 +75,8 @@ async def upload_file(file: UploadFile = File(...)) -> UploadResponse:
 
     # Parse file metadata
     try:
-        parser = ExcelParser()
-        sheets_metadata = parser.get_file_metadata(str(file_path))
+        with ExcelParser() as parser:
+            sheets_metadata = parser.get_file_metadata(str(file_path))
     except Exception as e:
         # Clean up on failure
         file_path.unlink(missing_ok=True)
@@ -115,8 +115,8 @@ async def get_file_metadata(file_id: str) -> FileMetadata:
 
     # Parse metadata
     try:
-        parser = ExcelParser()
-        sheets_metadata = parser.get_file_metadata(str(file_path))
+        with ExcelParser() as parser:
+            sheets_metadata = parser.get_file_metadata(str(file_path))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse file: {e}")
 
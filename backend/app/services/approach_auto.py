@@ -1,7 +1,7 @@
 """Approach 1: Fully Automatic LLM Extraction.
 
 This approach:
-1. Converts Excel to Markdown using MarkItDown
+1. Converts Excel to Markdown (one table per sheet)
 2. Splits into per-sheet chunks to avoid output token truncation
 3. Sends each sheet to LLM for question extraction
 4. Combines and parses XML responses to extract questions
@@ -29,6 +29,18 @@ from ..schemas import (
 )
 from .excel_parser import ExcelParser
 
+# XML type attribute -> QuestionType (includes the numeric types)
+XML_TYPE_MAPPING: dict[str, QuestionType] = {
+    "open_ended": QuestionType.OPEN_ENDED,
+    "single_choice": QuestionType.SINGLE_CHOICE,
+    "multiple_choice": QuestionType.MULTIPLE_CHOICE,
+    "grouped_question": QuestionType.GROUPED_QUESTION,
+    "yes_no": QuestionType.YES_NO,
+    "numeric": QuestionType.NUMERIC,
+    "integer": QuestionType.INTEGER,
+    "decimal": QuestionType.DECIMAL,
+}
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,9 +65,9 @@ class AutoExtractionService:
         )
 
     def _split_markdown_by_sheet(self, markdown_text: str) -> list[dict[str, str]]:
-        """Split MarkItDown output into per-sheet chunks.
+        """Split the converted markdown into per-sheet chunks.
 
-        MarkItDown produces markdown with ``## SheetName`` headers separating
+        ExcelParser produces markdown with ``## SheetName`` headers separating
         each Excel sheet. This method splits the full markdown into individual
         sheet sections so each can be processed by the LLM independently,
         avoiding output token truncation on large multi-sheet files.
@@ -63,7 +75,7 @@ class AutoExtractionService:
         Returns:
             List of dicts with ``sheet_name`` and ``content`` keys.
         """
-        # Match sheet headers produced by MarkItDown (## SheetName at line start)
+        # Match sheet headers produced by ExcelParser (## SheetName at line start)
         sheet_pattern = re.compile(r'^## (.+)$', re.MULTILINE)
         matches = list(sheet_pattern.finditer(markdown_text))
 
@@ -234,6 +246,9 @@ class AutoExtractionService:
                     total_time_ms=int((time.time() - start_time) * 1000),
                 ),
             )
+        finally:
+            # Release workbooks held open by the parser's cache
+            self.parser.close()
 
     def _build_prompt(self, content: str, sheet_name: str | None = None) -> str:
         """Build the extraction prompt with rich output format.
@@ -422,18 +437,6 @@ Extract ALL questions. Return ONLY the XML."""
             if not questions_tag:
                 return questions
 
-            # Type mapping including new types
-            type_mapping = {
-                "open_ended": QuestionType.OPEN_ENDED,
-                "single_choice": QuestionType.SINGLE_CHOICE,
-                "multiple_choice": QuestionType.MULTIPLE_CHOICE,
-                "grouped_question": QuestionType.GROUPED_QUESTION,
-                "yes_no": QuestionType.YES_NO,
-                "numeric": QuestionType.NUMERIC,
-                "integer": QuestionType.INTEGER,
-                "decimal": QuestionType.DECIMAL,
-            }
-
             # First pass: create questions with GUIDs and build seq->GUID mapping
             for q_tag in questions_tag.find_all("q"):
                 # Get sequence number
@@ -454,7 +457,7 @@ Extract ALL questions. Return ONLY the XML."""
                     continue
                 
                 type_str = q_tag.get("type", "open_ended")
-                question_type = type_mapping.get(type_str, QuestionType.OPEN_ENDED)
+                question_type = XML_TYPE_MAPPING.get(type_str, QuestionType.OPEN_ENDED)
                 
                 # Get help text
                 help_text_tag = q_tag.find("help_text")
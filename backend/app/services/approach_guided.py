@@ -28,6 +28,15 @@ from ..schemas import (
 )
 from .excel_parser import ExcelParser
 
+# XML type attribute -> QuestionType
+XML_TYPE_MAPPING: dict[str, QuestionType] = {
+    "open_ended": QuestionType.OPEN_ENDED,
+    "single_choice": QuestionType.SINGLE_CHOICE,
+    "multiple_choice": QuestionType.MULTIPLE_CHOICE,
+    "grouped_question": QuestionType.GROUPED_QUESTION,
+    "yes_no": QuestionType.YES_NO,
+}
+
 logger = logging.getLogger(__name__)
 
 
@@ -135,6 +144,9 @@ class GuidedExtractionService:
                     total_time_ms=int((time.time() - start_time) * 1000),
                 ),
             )
+        finally:
+            # Release workbooks held open by the parser's cache
+            self.parser.close()
 
     def _build_prompt(
         self,
@@ -243,14 +255,7 @@ IMPORTANT: Return ONLY the XML."""
                 question_text = q.get_text(strip=True)
                 type_str = q.get("type", "open_ended")
 
-                type_mapping = {
-                    "open_ended": QuestionType.OPEN_ENDED,
-                    "single_choice": QuestionType.SINGLE_CHOICE,
-                    "multiple_choice": QuestionType.MULTIPLE_CHOICE,
-                    "grouped_question": QuestionType.GROUPED_QUESTION,
-                    "yes_no": QuestionType.YES_NO,
-                }
-                question_type = type_mapping.get(type_str, QuestionType.OPEN_ENDED)
+                question_type = XML_TYPE_MAPPING.get(type_str, QuestionType.OPEN_ENDED)
 
                 answers = None
                 if "(" in question_text and "|" in question_text:
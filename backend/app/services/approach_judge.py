@@ -146,6 +146,9 @@ Total batches processed: {(len(questions) + batch_size - 1) // batch_size}
                     total_time_ms=int((time.time() - start_time) * 1000),
                 ),
             )
+        finally:
+            # Release workbooks held open by the parser's cache
+            self.parser.close()
 
     async def _judge_questions(
         self,
@@ -9,13 +9,18 @@ This approach uses a multi-step pipeline:
 All intermediate results are saved for POC debugging.
 """
 
+import asyncio
 import json
 import logging
 import time
+from collections import OrderedDict
+from collections.abc import Coroutine, Iterable
+from hashlib import blake2b
 from pathlib import Path
 from typing import Any
 
 import boto3
+import orjson
 from botocore.config import Config
 from bs4 import BeautifulSoup
 
@@ -42,12 +47,74 @@ MAX_SAMPLE_ROWS = 30
 # Step 3 extraction limits (for filtered markdown)
 MAX_ROWS_PER_BATCH = 100  # Maximum rows per LLM batch to control token usage
 
+# Identical prompts (retries, re-runs on the same file) are served from memory
+LLM_CACHE_SIZE = 256
+
+# Independent structure chunks / extraction batches run concurrently, bounded
+# to stay within Bedrock's per-account request quotas
+MAX_CONCURRENT_LLM_CALLS = 4
+
+# Step 4: XML type attribute -> QuestionType
+XML_TYPE_MAPPING: dict[str, QuestionType] = {
+    "open_ended": QuestionType.OPEN_ENDED,
+    "single_choice": QuestionType.SINGLE_CHOICE,
+    "multiple_choice": QuestionType.MULTIPLE_CHOICE,
+    "grouped_question": QuestionType.GROUPED_QUESTION,
+    "yes_no": QuestionType.YES_NO,
+    "numeric": QuestionType.NUMERIC,
+    "integer": QuestionType.INTEGER,
+    "decimal": QuestionType.DECIMAL,
+}
+
 logger = logging.getLogger(__name__)
 
 
+def _slice_xml_block(xml: str, tag: str) -> str | None:
+    """Return the outermost <tag ...>...</tag> block in an LLM response.
+
+    The opening tag may carry attributes. A missing closing tag (truncated
+    response) is appended so the parser still sees a well-formed root.
+    Returns None when the opening tag is absent.
+    """
+    open_prefix = f"<{tag}"
+    close_tag = f"</{tag}>"
+    start = xml.find(open_prefix)
+    while start >= 0:
+        next_char = xml[start + len(open_prefix) : start + len(open_prefix) + 1]
+        if next_char in (">", "/") or next_char.isspace():
+            break
+        start = xml.find(open_prefix, start + 1)
+    if start < 0:
+        return None
+
+    end = xml.rfind(close_tag, start)
+    if end < 0:
+        return xml[start:] + close_tag
+    return xml[start : end + len(close_tag)]
+
+
+async def _gather_fail_fast(coros: Iterable[Coroutine[Any, Any, Any]]) -> list[Any]:
+    """Run coroutines concurrently and return their results in order.
+
+    Unlike asyncio.gather, the first failure cancels the coroutines still
+    running, as a sequential loop would stop there, and is re-raised itself
+    rather than inside an ExceptionGroup.
+    """
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(coro) for coro in coros]
+    except ExceptionGroup as errors:
+        raise errors.exceptions[0] from None
+    return [task.result() for task in tasks]
+
+
 class PipelineExtractionService:
     """Multi-step pipeline extraction with intermediate result saving."""
 
+    # Shared across instances: a service is created per request, so an
+    # instance-level cache would never see a repeated prompt.
+    _llm_cache: "OrderedDict[bytes, str]" = OrderedDict()
+
     def __init__(self, model_id: str | None = None):
         self.settings = get_settings()
         self.parser = ExcelParser()
@@ -55,11 +122,14 @@ class PipelineExtractionService:
         # Use Sonnet 4.5 for judge step (Step 2: Coverage Validation)
         self.judge_model_id = self.settings.bedrock_sonnet_model_id
 
-        # Initialize Bedrock clients
+        # Initialize Bedrock clients. A larger keep-alive pool lets successive
+        # pipeline steps reuse warm TLS connections instead of re-handshaking.
         config = Config(
             read_timeout=600,
             connect_timeout=60,
             retries={"max_attempts": 3, "mode": "adaptive"},
+            max_pool_connections=50,
+            tcp_keepalive=True,
         )
         self.bedrock = boto3.client(
             "bedrock-runtime",
@@ -67,6 +137,11 @@ class PipelineExtractionService:
             config=config,
         )
 
+        # (model_id, response_format) -> (max_tokens, temperature), filled on first use
+        self._model_cfg_cache: dict[tuple[str, str], tuple[int, float]] = {}
+        # Bounds in-flight Bedrock requests when steps fan out concurrently
+        self._llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
         # Track metrics
         self.total_llm_calls = 0
         self.structure_analysis_time_ms = 0
@@ -315,6 +390,9 @@ class PipelineExtractionService:
                     total_time_ms=int((time.time() - start_time) * 1000),
                 ),
             )
+        finally:
+            # Release workbooks held open by the parser's cache
+            self.parser.close()
 
     async def _analyze_structure(self, file_path: str, intermediate_dir: Path | None = None) -> dict[str, Any]:
         """Step 1: Analyze Excel structure to identify question/answer columns.
@@ -343,8 +421,7 @@ class PipelineExtractionService:
         
         logger.info(f"Processing {len(metadata)} sheets in {chunk_count} chunk(s)")
         
-        for chunk_idx, sheet_chunk in enumerate(chunks):
-            chunk_num = chunk_idx + 1
+        async def analyze_chunk(chunk_num: int, sheet_chunk: list[SheetMetadata]) -> str | None:
             sheet_names = [s.name for s in sheet_chunk]
             logger.info(f"Processing chunk {chunk_num}/{chunk_count}: sheets {sheet_names}")
             
@@ -363,10 +440,9 @@ class PipelineExtractionService:
             # Call LLM
             try:
                 response = await self._invoke_llm(prompt, self.model_id, "xml")
-                self.total_llm_calls += 1
             except Exception as e:
                 logger.error(f"LLM call failed for chunk {chunk_num}: {e}")
-                continue
+                return None
             
             # Save response
             if intermediate_dir:
@@ -376,7 +452,18 @@ class PipelineExtractionService:
                     response_file = intermediate_dir / f"step1_structure_chunk_{chunk_num}_response.xml"
                 response_file.write_text(response)
             
-            if not response or not response.strip():
+            return response
+        
+        # Chunks are independent: run them concurrently, then merge in chunk order
+        responses = await _gather_fail_fast(
+            analyze_chunk(chunk_num, sheet_chunk) for chunk_num, sheet_chunk in enumerate(chunks, start=1)
+        )
+        
+        for chunk_num, response in enumerate(responses, start=1):
+            if response is None:
+                continue  # LLM call failed, already logged
+            
+            if not response.strip():
                 logger.warning(f"Empty response from chunk {chunk_num}")
                 continue
             
@@ -437,7 +524,6 @@ Return ONLY the XML."""
             prompt_file.write_text(prompt)
         
         response = await self._invoke_llm(prompt, self.judge_model_id, "xml")
-        self.total_llm_calls += 1
         
         # Save response
         if intermediate_dir:
@@ -464,12 +550,7 @@ Return ONLY the XML."""
         # Extract filtered markdown for each sheet
         batches = self._extract_with_context(structure, file_path)
         
-        all_xml_parts = []
-        batch_num = 0
-        
-        for batch in batches:
-            batch_num += 1
-            
+        async def extract_batch(batch_num: int, batch: dict) -> str:
             # Get the actual sheet name from the batch dict
             actual_sheet_name = batch.get("sheet_name", "Sheet1")
             
@@ -482,7 +563,6 @@ Return ONLY the XML."""
                 prompt_file.write_text(prompt)
             
             response = await self._invoke_llm(prompt, self.model_id, "xml")
-            self.total_llm_calls += 1
             
             # Save raw response before any modification
             if intermediate_dir:
@@ -502,7 +582,14 @@ Return ONLY the XML."""
                 xml_file = intermediate_dir / f"step3_question_extraction_batch_{batch_num}.xml"
                 xml_file.write_text(response)
             
-            all_xml_parts.append(response)
+            return response
+        
+        # Batches are independent: run them concurrently, keeping batch order.
+        # The first failing batch cancels the rest, so no further Bedrock calls
+        # or intermediate files are spent on a step that has already failed.
+        all_xml_parts = await _gather_fail_fast(
+            extract_batch(batch_num, batch) for batch_num, batch in enumerate(batches, start=1)
+        )
         
         # Combine all batches
         combined_xml = "<questions>\n" + "\n".join(
@@ -529,16 +616,12 @@ Return ONLY the XML."""
         
         Returns list of dicts with {sheet_name, markdown, header_row, data_start_row, columns, batch_num}
         """
-        import openpyxl
-        
         batches = []
+        structure_sheet_names = [s["sheet_name"] for s in structure.get("sheets", [])]
         
-        # Get row counts for each sheet to determine batching
-        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        sheet_row_counts = {}
-        for sheet_name in wb.sheetnames:
-            sheet_row_counts[sheet_name] = wb[sheet_name].max_row
-        wb.close()
+        # Get row counts for each sheet to determine batching (from the parser's
+        # shared sheet cache, which the filtered markdown below reads as well)
+        sheet_row_counts = self.parser.get_sheet_max_rows(file_path, sheet_names=structure_sheet_names)
         
         # Build pandas-style column name -> index mapping from file metadata.
         # Step 1 uses pandas which reads row 1 as the header, producing names like
@@ -546,7 +629,7 @@ Return ONLY the XML."""
         # uses openpyxl with the actual header_row (e.g., row 4), where column names
         # may differ ("Question", "Response", etc.). We need to resolve pandas names
         # to positional indices so the markdown generator can find the right columns.
-        metadata = self.parser.get_file_metadata(file_path)
+        metadata = self.parser.get_file_metadata(file_path, sheet_names=structure_sheet_names)
         pandas_col_to_index: dict[str, dict[str, int]] = {}  # sheet_name -> {col_name -> index}
         if metadata:
             for sheet_meta in metadata:
@@ -873,11 +956,11 @@ Return ONLY the XML."""
         """
         import uuid
         
-        questions = []
-        # Map sheet:row -> question_id (GUID) for dependency resolution
-        location_to_guid: dict[str, str] = {}
-        # Store raw dependency data for second pass
-        raw_dependencies: dict[int, list[dict]] = {}
+        questions: list[ExtractedQuestion] = []
+        # Map (sheet, row) -> question_id (GUID) for dependency resolution
+        location_to_guid: dict[tuple[str, int], str] = {}
+        # Questions with raw dependency data, resolved in the second pass
+        raw_dependencies: list[tuple[ExtractedQuestion, list[dict[str, Any]]]] = []
         
         try:
             soup = BeautifulSoup(xml, "xml")
@@ -888,7 +971,33 @@ Return ONLY the XML."""
             
             # First pass: create questions with GUIDs and build location map
             for idx, q_tag in enumerate(questions_tag.find_all("q")):
-                question_text = q_tag.find("text")
+                # Walk the direct children once and dispatch on tag name rather
+                # than running a separate find() descent per sub-element.
+                question_text = None
+                help_text_tag = None
+                answers_tag = None
+                cond_inputs_tag = None
+                deps_tag = None
+                for child in q_tag.children:
+                    name = child.name
+                    if name is None:
+                        continue  # Whitespace / text nodes
+                    if name == "text":
+                        if question_text is None:
+                            question_text = child
+                    elif name == "help_text":
+                        if help_text_tag is None:
+                            help_text_tag = child
+                    elif name == "answers":
+                        if answers_tag is None:
+                            answers_tag = child
+                    elif name == "conditional_inputs":
+                        if cond_inputs_tag is None:
+                            cond_inputs_tag = child
+                    elif name == "dependencies":
+                        if deps_tag is None:
+                            deps_tag = child
+
                 if not question_text:
                     continue
                 
@@ -896,37 +1005,26 @@ Return ONLY the XML."""
                 q_type_str = q_tag.get("type", "open_ended")
                 
                 # Map type
-                type_mapping = {
-                    "open_ended": QuestionType.OPEN_ENDED,
-                    "single_choice": QuestionType.SINGLE_CHOICE,
-                    "multiple_choice": QuestionType.MULTIPLE_CHOICE,
-                    "grouped_question": QuestionType.GROUPED_QUESTION,
-                    "yes_no": QuestionType.YES_NO,
-                    "numeric": QuestionType.NUMERIC,
-                    "integer": QuestionType.INTEGER,
-                    "decimal": QuestionType.DECIMAL,
-                }
-                question_type = type_mapping.get(q_type_str, QuestionType.OPEN_ENDED)
+                question_type = XML_TYPE_MAPPING.get(q_type_str, QuestionType.OPEN_ENDED)
                 
                 # Help text
-                help_text_tag = q_tag.find("help_text")
-                help_text = help_text_tag.get_text(strip=True) if help_text_tag else None
+                help_text: str | None = help_text_tag.get_text(strip=True) if help_text_tag else None
                 if help_text == "":
                     help_text = None
                 
                 # Answers
-                answers = None
-                answers_tag = q_tag.find("answers")
+                answers: list[str] | None = None
                 if answers_tag:
-                    options = answers_tag.find_all("option")
-                    if options:
-                        answers = [opt.get_text(strip=True) for opt in options]
+                    answers = [
+                        opt.get_text(strip=True)
+                        for opt in answers_tag.children
+                        if opt.name == "option"
+                    ] or None
                 
                 # Conditional inputs (for answers that require additional detail)
-                conditional_inputs = None
-                cond_inputs_tag = q_tag.find("conditional_inputs")
+                conditional_inputs: dict[str, str] | None = None
                 if cond_inputs_tag:
-                    input_tags = cond_inputs_tag.find_all("input")
+                    input_tags = [tag for tag in cond_inputs_tag.children if tag.name == "input"]
                     if input_tags:
                         conditional_inputs = {}
                         for input_tag in input_tags:
@@ -941,17 +1039,19 @@ Return ONLY the XML."""
                 question_id = str(uuid.uuid4())
                 
                 # Store location -> GUID mapping
-                question_sheet = q_tag.get("sheet", "")
-                row_index = int(q_tag.get("row")) if q_tag.get("row") else None
+                question_sheet: str = q_tag.get("sheet", "")
+                row_attr = q_tag.get("row")
+                row_index: int | None = int(row_attr) if row_attr else None
                 if question_sheet and row_index is not None:
-                    location_key = f"{question_sheet}:{row_index}"
-                    location_to_guid[location_key] = question_id
+                    location_to_guid[(question_sheet, row_index)] = question_id
                 
                 # Store raw dependencies for second pass
-                deps_tag = q_tag.find("dependencies")
+                raw_deps: list[dict[str, Any]] | None
                 if deps_tag:
                     raw_deps = []
-                    for dep_tag in deps_tag.find_all("depends_on"):
+                    for dep_tag in deps_tag.children:
+                        if dep_tag.name != "depends_on":
+                            continue
                         raw_dep_id = dep_tag.get("question_row") or dep_tag.get("question_id") or ""
                         raw_deps.append({
                             "raw_id": raw_dep_id,
@@ -961,39 +1061,46 @@ Return ONLY the XML."""
                             "action": dep_tag.get("action", "show"),
                             "original_text": dep_tag.get("original_text"),
                         })
-                    if raw_deps:
-                        raw_dependencies[len(questions)] = raw_deps
+                else:
+                    raw_deps = None
                 
-                questions.append(
-                    ExtractedQuestion(
-                        question_id=question_id,
-                        question_text=q_text,
-                        question_type=question_type,
-                        answers=answers,
-                        help_text=help_text,
-                        conditional_inputs=conditional_inputs,
-                        dependencies=None,  # Will be set in second pass
-                        row_index=row_index,
-                        sheet_name=question_sheet if question_sheet else None,
-                    )
+                question = ExtractedQuestion(
+                    question_id=question_id,
+                    question_text=q_text,
+                    question_type=question_type,
+                    answers=answers,
+                    help_text=help_text,
+                    conditional_inputs=conditional_inputs,
+                    dependencies=None,  # Will be set in second pass
+                    row_index=row_index,
+                    sheet_name=question_sheet if question_sheet else None,
                 )
+                questions.append(question)
+                if raw_deps:
+                    raw_dependencies.append((question, raw_deps))
             
+            if not raw_dependencies:
+                return questions
+
             # Second pass: resolve dependencies using GUIDs
-            for q_idx, raw_deps in raw_dependencies.items():
-                dependencies = []
-                for raw_dep in raw_deps:
+            for question, question_deps in raw_dependencies:
+                dependencies: list[QuestionDependency] = []
+                # All raw deps of a question share that question's sheet
+                sheet: str = question_deps[0]["sheet"]
+                sheet_prefix = f"{sheet}:" if sheet else ""
+                for raw_dep in question_deps:
                     # Build location key to lookup the GUID
-                    raw_id = raw_dep["raw_id"]
-                    sheet = raw_dep["sheet"]
+                    raw_id: str = raw_dep["raw_id"]
                     
                     # Create composite key for lookup
-                    if sheet and raw_id:
-                        location_key = f"{sheet}:{raw_id}"
-                    else:
-                        location_key = raw_id
+                    location_key = sheet_prefix + raw_id if raw_id else raw_id
                     
                     # Resolve to GUID if found, otherwise keep the raw reference
-                    resolved_id = location_to_guid.get(location_key, location_key)
+                    dep_sheet, _, dep_row = location_key.rpartition(":")
+                    if dep_row.isdecimal():
+                        resolved_id = location_to_guid.get((dep_sheet, int(dep_row)), location_key)
+                    else:
+                        resolved_id = location_key
                     
                     dep = QuestionDependency(
                         depends_on_question_id=resolved_id,
@@ -1005,20 +1112,26 @@ Return ONLY the XML."""
                     dependencies.append(dep)
                 
                 if dependencies:
-                    questions[q_idx].dependencies = dependencies
+                    question.dependencies = dependencies
         
         except Exception as e:
             logger.error(f"XML normalization error: {e}", exc_info=True)
         
         return questions
 
-    async def _invoke_llm(self, prompt: str, model_id: str, response_format: str) -> str:
-        """Invoke Bedrock LLM."""
+    def _model_config(self, model_id: str, response_format: str) -> tuple[int, float]:
+        """Resolve (max_tokens, temperature) for a model, cached per instance."""
+        key = (model_id, response_format)
+        cfg = self._model_cfg_cache.get(key)
+        if cfg is not None:
+            return cfg
+
         # Determine max_tokens based on model
         # Opus 4.5 supports 32K, Sonnet 4.5 supports 16K
-        if "opus" in model_id.lower():
+        model_lower = model_id.lower()
+        if "opus" in model_lower:
             max_tokens = 32768  # Opus 4.5 maximum
-        elif "sonnet" in model_id.lower():
+        elif "sonnet" in model_lower:
             max_tokens = 16384  # Sonnet 4.5 maximum
         else:
             # Fallback to settings
@@ -1026,6 +1139,39 @@ Return ONLY the XML."""
         
         # Use lower temperature for JSON responses (judge steps)
         temperature = self.settings.temperature if response_format == "xml" else self.settings.judge_temperature
+
+        cfg = (max_tokens, temperature)
+        self._model_cfg_cache[key] = cfg
+        return cfg
+
+    async def _invoke_llm(self, prompt: str, model_id: str, response_format: str) -> str:
+        """Invoke Bedrock LLM, reusing cached responses for identical prompts.
+
+        Only calls that reach Bedrock count towards total_llm_calls.
+        """
+        hasher = blake2b(digest_size=16)
+        hasher.update(f"{model_id}\0{response_format}\0".encode())
+        hasher.update(prompt.encode())
+        cache_key = hasher.digest()
+
+        cached = self._llm_cache.get(cache_key)
+        if cached is not None:
+            self._llm_cache.move_to_end(cache_key)
+            logger.info("LLM cache hit, skipping Bedrock call")
+            return cached
+
+        response_text = await self._invoke_llm_uncached(prompt, model_id, response_format)
+        self.total_llm_calls += 1
+
+        if response_text:
+            self._llm_cache[cache_key] = response_text
+            if len(self._llm_cache) > LLM_CACHE_SIZE:
+                self._llm_cache.popitem(last=False)
+        return response_text
+
+    async def _invoke_llm_uncached(self, prompt: str, model_id: str, response_format: str) -> str:
+        """Invoke Bedrock LLM."""
+        max_tokens, temperature = self._model_config(model_id, response_format)
         
         payload = {
             "anthropic_version": "bedrock-2023-05-31",
@@ -1034,45 +1180,44 @@ Return ONLY the XML."""
             "messages": [{"role": "user", "content": prompt}],
         }
         
-        response = self.bedrock.invoke_model(
-            modelId=model_id,
-            body=json.dumps(payload),
-            contentType="application/json",
-        )
-        
-        response_body = json.loads(response["body"].read())
+        # boto3 is blocking; run the request (and body read) in a worker thread
+        # so the event loop stays free while Bedrock responds.
+        async with self._llm_semaphore:
+            response_body = await asyncio.to_thread(self._invoke_model_sync, model_id, payload)
         
         if "content" in response_body and len(response_body["content"]) > 0:
             return response_body["content"][0]["text"]
         
         raise Exception("No content in Bedrock response")
 
+    def _invoke_model_sync(self, model_id: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Blocking Bedrock call; returns the decoded response body."""
+        response = self.bedrock.invoke_model(
+            modelId=model_id,
+            body=json.dumps(payload),
+            contentType="application/json",
+        )
+        return json.loads(response["body"].read())
+
     def _parse_structure_xml(self, xml: str) -> dict[str, Any]:
         """Parse structure analysis XML response."""
         try:
             # Find XML content
-            xml_start = xml.find("<structure_analysis>")
-            xml_end = xml.rfind("</structure_analysis>")
-            
-            if xml_start < 0:
+            xml_text = _slice_xml_block(xml, "structure_analysis")
+            if xml_text is None:
                 return {"sheets": [], "confidence": 0.0}
             
-            if xml_end < 0:
-                xml_text = xml[xml_start:] + "</structure_analysis>"
-            else:
-                xml_text = xml[xml_start : xml_end + len("</structure_analysis>")]
-            
             soup = BeautifulSoup(xml_text, "xml")
             structure_tag = soup.find("structure_analysis")
             
             if not structure_tag:
                 return {"sheets": [], "confidence": 0.0}
             
-            sheets = []
-            sheet_confidences = []
+            sheets: list[dict[str, Any]] = []
+            sheet_confidences: list[float] = []
             for sheet_tag in structure_tag.find_all("sheet"):
                 columns_tag = sheet_tag.find("columns")
-                columns = {}
+                columns: dict[str, str | None] = {}
                 if columns_tag:
                     columns = {
                         "question_column": columns_tag.get("question_column", ""),
@@ -1088,7 +1233,8 @@ Return ONLY the XML."""
                 structure_notes = structure_notes_tag.get_text(strip=True) if structure_notes_tag else ""
                 
                 # Per-sheet confidence
-                sheet_confidence = float(sheet_tag.get("confidence", 0.0)) if sheet_tag.get("confidence") else 0.0
+                sheet_conf_attr = sheet_tag.get("confidence")
+                sheet_confidence = float(sheet_conf_attr) if sheet_conf_attr else 0.0
                 sheet_confidences.append(sheet_confidence)
                 
                 sheets.append({
@@ -1100,7 +1246,8 @@ Return ONLY the XML."""
                 })
             
             # Confidence: prefer root-level attribute, fall back to average of per-sheet confidences
-            confidence = float(structure_tag.get("confidence", 0.0)) if structure_tag.get("confidence") else 0.0
+            conf_attr = structure_tag.get("confidence")
+            confidence: float = float(conf_attr) if conf_attr else 0.0
             if confidence == 0.0 and sheet_confidences:
                 confidence = sum(sheet_confidences) / len(sheet_confidences)
             
@@ -1116,33 +1263,27 @@ Return ONLY the XML."""
         """Parse coverage validation XML response."""
         try:
             # Find XML content
-            xml_start = xml.find("<coverage_validation>")
-            xml_end = xml.rfind("</coverage_validation>")
-            
-            if xml_start < 0:
+            xml_text = _slice_xml_block(xml, "coverage_validation")
+            if xml_text is None:
                 return {"is_complete": True, "missing_elements": [], "suggestions": [], "confidence": 0.5}
             
-            if xml_end < 0:
-                xml_text = xml[xml_start:] + "</coverage_validation>"
-            else:
-                xml_text = xml[xml_start : xml_end + len("</coverage_validation>")]
-            
             soup = BeautifulSoup(xml_text, "xml")
             coverage_tag = soup.find("coverage_validation")
             
             if not coverage_tag:
                 return {"is_complete": True, "missing_elements": [], "suggestions": [], "confidence": 0.5}
             
-            is_complete = coverage_tag.get("is_complete", "true").lower() == "true"
-            confidence = float(coverage_tag.get("confidence", 0.5)) if coverage_tag.get("confidence") else 0.5
+            is_complete: bool = coverage_tag.get("is_complete", "true").lower() == "true"
+            conf_attr = coverage_tag.get("confidence")
+            confidence: float = float(conf_attr) if conf_attr else 0.5
             
-            missing_elements = []
+            missing_elements: list[str] = []
             missing_tag = coverage_tag.find("missing_elements")
             if missing_tag:
                 for elem in missing_tag.find_all("element"):
                     missing_elements.append(elem.get_text(strip=True))
             
-            suggestions = []
+            suggestions: list[str] = []
             suggestions_tag = coverage_tag.find("suggestions")
             if suggestions_tag:
                 for suggestion in suggestions_tag.find_all("suggestion"):
@@ -1161,13 +1302,21 @@ Return ONLY the XML."""
     def _save_intermediate_result(
         self, intermediate_dir: Path, step: int, data: dict | list | str, run_id: str, filename: str
     ) -> None:
-        """Save intermediate result to file."""
+        """Save intermediate result to file.
+
+        JSON payloads are serialized straight to UTF-8 bytes with orjson and
+        written in binary mode, avoiding an intermediate str and re-encode.
+        """
         try:
             result_file = intermediate_dir / filename
             if isinstance(data, str):
-                result_file.write_text(data)
+                payload = data.encode("utf-8")
             else:
-                result_file.write_text(json.dumps(data, indent=2, default=str))
+                payload = orjson.dumps(
+                    data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str
+                )
+            with open(result_file, "wb") as f:
+                f.write(payload)
             logger.info(f"Saved intermediate result: {filename}")
         except Exception as e:
             logger.error(f"Failed to save intermediate result {filename}: {e}")
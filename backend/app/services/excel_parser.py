@@ -1,89 +1,680 @@
 """Excel and CSV file parsing utilities."""
 
 import csv
+import io
 import logging
 import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from itertools import chain, islice
 from pathlib import Path
 from typing import Any
 
 import openpyxl
-from markitdown import MarkItDown
 
 from ..schemas import SheetMetadata, ColumnMapping, ExtractedQuestion, QuestionType
 
 logger = logging.getLogger(__name__)
 
+# Check if pyarrow is available (faster CSV metadata scans)
+PYARROW_AVAILABLE = False
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    logger.info("pyarrow not installed. CSV metadata uses the csv module.")
+
+# Check if python-calamine is available (Rust Excel reader, much faster than openpyxl)
+CALAMINE_AVAILABLE = False
+try:
+    from python_calamine import CalamineWorkbook
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    logger.info("python-calamine not installed. Excel reads use openpyxl.")
+
+# Whole floats up to this magnitude are exact, so they can be read back as int
+MAX_EXACT_FLOAT_INT = 2**53
+
 # File type detection
 EXCEL_EXTENSIONS = {".xlsx", ".xls", ".xlsm", ".xltx", ".xltm"}
 CSV_EXTENSIONS = {".csv"}
 
+# CSV dialect sniffing: a few lines are enough, and restricting the candidate
+# delimiters keeps the Sniffer's regex heuristics cheap
+CSV_SNIFF_BYTES = 1024
+CSV_SNIFF_DELIMITERS = ",;\t|"
+# CSV size from which Arrow reads a memory-mapped file
+CSV_MMAP_MIN_BYTES = 1 << 20
+# CSV size from which the shared row cache is filled by Arrow instead of csv.reader
+CSV_ARROW_ROWS_MIN_BYTES = 4 << 20
+
+
+class _ExcelSemicolon(csv.excel):
+    """csv.excel with ';' as delimiter (common in European locales)."""
+
+    delimiter = ";"
+
+
+class _ExcelPipe(csv.excel):
+    """csv.excel with '|' as delimiter."""
+
+    delimiter = "|"
+
+
+# Header delimiter -> dialect, used when the first line decides the delimiter
+CSV_FAST_DIALECTS: dict[str, type[csv.Dialect]] = {
+    ",": csv.excel,
+    ";": _ExcelSemicolon,
+    "\t": csv.excel_tab,
+    "|": _ExcelPipe,
+}
+
+# Read-only workbooks kept open per parser, so metadata/extract/count calls
+# on the same upload parse the workbook package only once
+WORKBOOK_CACHE_SIZE = 4
+# Materialized sheet rows shared by every parser in the process (each approach
+# creates its own ExcelParser), most recently used last
+SHEET_ROWS_CACHE_SIZE = 8
+_sheet_rows_cache: OrderedDict[tuple[str, int, int, str], list[tuple[Any, ...]]] = OrderedDict()
+# Parsed CSV rows, shared the same way
+CSV_ROWS_CACHE_SIZE = 4
+_csv_rows_cache: OrderedDict[tuple[str, int, int, type[csv.Dialect] | None], list[list[str]]] = OrderedDict()
+_rows_cache_lock = threading.Lock()
+# Upper bound on sheets scanned in parallel for metadata
+MAX_METADATA_WORKERS = 8
+
+# Metadata sampling limits (first 30 rows, first 10 columns, truncate long values)
+MAX_SAMPLE_ROWS = 30
+MAX_SAMPLE_COLS = 10
+MAX_CELL_LENGTH = 200
+# Longest cell value kept in filtered (Step 3) markdown
+FILTERED_MAX_CELL_LENGTH = 500
+
+# Markdown table cell escaping: escape pipes, keep each row on one line
+MD_ESCAPE = str.maketrans({"|": "\\|", "\n": " ", "\r": " "})
+
+# Lower-cased answers that make a two-answer question YES_NO
+YES_NO = frozenset({"yes", "no"})
+
+# Positional column names ("Unnamed: 3") produced for blank headers
+UNNAMED_COLUMN_RE = re.compile(r"Unnamed:\s*(\d+)")
+
+# Type column value -> QuestionType for deterministic extraction
+TYPE_MAPPING: dict[str, QuestionType] = {
+    "open": QuestionType.OPEN_ENDED,
+    "open_ended": QuestionType.OPEN_ENDED,
+    "single": QuestionType.SINGLE_CHOICE,
+    "single_choice": QuestionType.SINGLE_CHOICE,
+    "multiple": QuestionType.MULTIPLE_CHOICE,
+    "multiple_choice": QuestionType.MULTIPLE_CHOICE,
+    "grouped": QuestionType.GROUPED_QUESTION,
+    "grouped_question": QuestionType.GROUPED_QUESTION,
+    "yes_no": QuestionType.YES_NO,
+    "yesno": QuestionType.YES_NO,
+}
+
+# Separators folded to "_" when a type value misses TYPE_MAPPING ("Single Choice", "yes-no")
+TYPE_KEY_SEPARATORS = str.maketrans({"-": "_", " ": "_"})
+
+
+def _md_cell(value: Any, max_length: int | None = None) -> str:
+    """Render a cell value for a markdown table ("-" for empty).
+
+    Values longer than max_length (after escaping) are cut and end in "...".
+    """
+    if value is None:
+        return "-"
+    text = str(value).rstrip()
+    if max_length is not None and len(text) > max_length:
+        # Cut before escaping so huge cells (essays, blobs) are only
+        # translated up to the limit; escaping never shortens text
+        text = text.lstrip()[: max_length + 1]
+        if len(text) > max_length:
+            return text.translate(MD_ESCAPE)[:max_length] + "..."
+    text = text.lstrip()
+    if not text:
+        return "-"
+    text = text.translate(MD_ESCAPE)
+    if max_length is not None and len(text) > max_length:
+        return text[:max_length] + "..."
+    return text
+
+
+def _excel_headers(header_row: Iterable[Any]) -> list[str]:
+    """Name the columns of an Excel header row ("Unnamed: N" for blank cells).
+
+    Uses 0-based column indices to match the markitdown/pandas format.
+    """
+    return [
+        str(value) if value is not None else f"Unnamed: {col_idx}"
+        for col_idx, value in enumerate(header_row)
+    ]
+
+
+def _header_index(headers: list[str]) -> dict[str, int]:
+    """Map each column name to its first position."""
+    index: dict[str, int] = {}
+    for col_idx, name in enumerate(headers):
+        index.setdefault(name, col_idx)
+    return index
+
+
+def _mapping_header_index(headers: list[str]) -> dict[str, int]:
+    """Map each column name to its last position.
+
+    Column mappings resolve a duplicated header to its last occurrence.
+    """
+    return {name: col_idx for col_idx, name in enumerate(headers)}
+
+
+def _header_index_lower(headers: list[str]) -> dict[str, int]:
+    """Map each lower-cased, stripped column name to its first position."""
+    index: dict[str, int] = {}
+    for col_idx, name in enumerate(headers):
+        index.setdefault(name.lower().strip(), col_idx)
+    return index
+
+
+def _question_type(value: str) -> QuestionType:
+    """Map a type column value to a QuestionType, defaulting to OPEN_ENDED."""
+    key = value.strip().lower()
+    question_type = TYPE_MAPPING.get(key)
+    if question_type is None:
+        question_type = TYPE_MAPPING.get(key.translate(TYPE_KEY_SEPARATORS), QuestionType.OPEN_ENDED)
+    return question_type
+
+
+def _split_answers(answer_text: str) -> list[str]:
+    """Split an answer cell into options: pipe-separated, else newline-separated."""
+    # split() doubles as the membership test, so each separator is scanned once
+    options = answer_text.split("|")
+    if len(options) == 1:
+        options = answer_text.split("\n")
+    return [a.strip() for a in options]
+
+
+def _cell_value(value: Any) -> Any:
+    """Normalize a cell value so calamine and openpyxl read a cell the same way.
+
+    Empty strings become None, since calamine cannot tell them apart from
+    empty cells. Dates become midnight datetimes and whole floats become ints,
+    as openpyxl reads them; floats beyond MAX_EXACT_FLOAT_INT stay floats.
+    """
+    if value == "":
+        return None
+    if isinstance(value, float):
+        if value.is_integer() and -MAX_EXACT_FLOAT_INT <= value <= MAX_EXACT_FLOAT_INT:
+            return int(value)
+        return value
+    if type(value) is date:
+        return datetime.combine(value, time())
+    return value
+
+
+def _sheet_grid(raw_rows: Iterable[Iterable[Any]]) -> list[tuple[Any, ...]]:
+    """Normalize the rows of a sheet read by calamine or openpyxl.
+
+    Cells go through _cell_value. Trailing empty rows are dropped, and every
+    row is cut or padded to the last column holding a value: openpyxl also
+    reports formatted empty cells, and reads unsized sheets as ragged rows.
+    """
+    rows = [tuple(map(_cell_value, row)) for row in raw_rows]
+    while rows and rows[-1].count(None) == len(rows[-1]):
+        rows.pop()
+    width = 0
+    for row in rows:
+        for col_idx in range(len(row) - 1, width - 1, -1):
+            if row[col_idx] is not None:
+                width = col_idx + 1
+                break
+    return [row[:width] + (None,) * (width - len(row)) for row in rows]
+
+
+def _arrow_read_csv(
+    file_path: str,
+    dialect: type[csv.Dialect],
+    num_columns: int,
+    skip_rows: int = 0,
+    ignore_empty_lines: bool = True,
+) -> "pa.Table":
+    """Read a CSV with pyarrow, every column as a non-null string (like the csv module).
+
+    Large files are memory-mapped so Arrow parses straight from the page cache.
+    Raises pa.ArrowInvalid when Arrow cannot parse the file (e.g. ragged rows).
+    """
+    names = [f"c{col_idx}" for col_idx in range(num_columns)]
+    source = file_path
+    if Path(file_path).stat().st_size >= CSV_MMAP_MIN_BYTES:
+        source = pa.memory_map(file_path)
+    try:
+        return pacsv.read_csv(
+            source,
+            read_options=pacsv.ReadOptions(column_names=names, skip_rows=skip_rows, block_size=1 << 20),
+            parse_options=pacsv.ParseOptions(
+                delimiter=dialect.delimiter,
+                quote_char=dialect.quotechar or False,
+                double_quote=dialect.doublequote,
+                escape_char=dialect.escapechar or False,
+                newlines_in_values=True,
+                ignore_empty_lines=ignore_empty_lines,
+            ),
+            convert_options=pacsv.ConvertOptions(
+                column_types={name: pa.string() for name in names},
+                strings_can_be_null=False,
+            ),
+        )
+    finally:
+        if source is not file_path:
+            source.close()
+
 
 class ExcelParser:
     """Parse Excel files for metadata and content extraction."""
 
     def __init__(self):
-        self.markitdown = MarkItDown()
+        # (path, mtime) -> sniffed dialect, shared by all CSV read paths
+        self._dialect_cache: dict[tuple[str, float], type[csv.Dialect]] = {}
+        # (path, mtime) -> open read-only workbook, least recently used first
+        self._wb_cache: OrderedDict[tuple[str, float], openpyxl.Workbook] = OrderedDict()
+        # Guards _wb_cache: metadata scans sheets from worker threads
+        self._wb_lock = threading.Lock()
+        # (path, mtime) -> open calamine workbook, least recently used first.
+        # Opening parses the shared strings, so all sheets of a file share one.
+        self._calamine_cache: OrderedDict[tuple[str, float], Any] = OrderedDict()
+        # Guards _calamine_cache and sheet reads: workbooks are not thread-safe
+        self._calamine_lock = threading.Lock()
+        # (path, mtime, sheet) -> (column names, column name -> index)
+        self._headers_cache: dict[tuple[str, float, str], tuple[list[str], dict[str, int]]] = {}
+
+    def __enter__(self) -> "ExcelParser":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close any workbooks held open by the parser."""
+        with self._wb_lock:
+            while self._wb_cache:
+                _, wb = self._wb_cache.popitem()
+                wb.close()
+        with self._calamine_lock:
+            self._calamine_cache.clear()
+        self._headers_cache.clear()
+
+    @contextmanager
+    def _workbook(self, file_path: str) -> Iterator[openpyxl.Workbook]:
+        """Yield a cached read-only workbook, reloading it if the file changed.
+
+        Safe to call from several threads: the workbook is loaded once, and
+        each worksheet iteration opens its own stream from the zip archive.
+        """
+        cache_key = (file_path, Path(file_path).stat().st_mtime)
+        with self._wb_lock:
+            wb = self._wb_cache.get(cache_key)
+            if wb is not None:
+                self._wb_cache.move_to_end(cache_key)
+            else:
+                # Drop workbooks for older versions of the same file
+                for key in [key for key in self._wb_cache if key[0] == file_path]:
+                    self._wb_cache.pop(key).close()
+                wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+                self._wb_cache[cache_key] = wb
+                if len(self._wb_cache) > WORKBOOK_CACHE_SIZE:
+                    _, evicted = self._wb_cache.popitem(last=False)
+                    evicted.close()
+        yield wb
+
+    def _calamine_workbook(self, file_path: str) -> Any:
+        """Return a cached calamine workbook, reopening it if the file changed.
+
+        Callers must hold _calamine_lock.
+        """
+        cache_key = (file_path, Path(file_path).stat().st_mtime)
+        wb = self._calamine_cache.get(cache_key)
+        if wb is not None:
+            self._calamine_cache.move_to_end(cache_key)
+            return wb
+        for key in [key for key in self._calamine_cache if key[0] == file_path]:
+            del self._calamine_cache[key]
+        wb = CalamineWorkbook.from_path(file_path)
+        self._calamine_cache[cache_key] = wb
+        if len(self._calamine_cache) > WORKBOOK_CACHE_SIZE:
+            self._calamine_cache.popitem(last=False)
+        return wb
+
+    def _sheet_names(self, file_path: str) -> list[str]:
+        """List the sheet names of an Excel file."""
+        if CALAMINE_AVAILABLE:
+            try:
+                with self._calamine_lock:
+                    return self._calamine_workbook(file_path).sheet_names
+            except Exception as e:
+                logger.warning(f"calamine could not open '{file_path}', using openpyxl: {e}")
+        with self._workbook(file_path) as wb:
+            return wb.sheetnames
+
+    def _read_calamine_sheet(self, file_path: str, sheet_name: str) -> list[list[Any]] | None:
+        """Read the raw cell values of a whole sheet with calamine, or None if calamine fails."""
+        try:
+            with self._calamine_lock:
+                sheet = self._calamine_workbook(file_path).get_sheet_by_name(sheet_name)
+                # skip_empty_area=False keeps row/column positions anchored at A1
+                return sheet.to_python(skip_empty_area=False)
+        except Exception as e:
+            logger.warning(f"calamine could not read sheet '{sheet_name}', using openpyxl: {e}")
+            return None
+
+    def _read_openpyxl_sheet(self, file_path: str, sheet_name: str) -> list[tuple[Any, ...]]:
+        """Read the raw cell values of a whole sheet from the cached openpyxl workbook.
+
+        The stored dimension is discarded: it may be stale in either direction
+        (e.g. "A1:A1", which read-only mode would use to cut every row to one
+        cell, or a max_row of 1048576). Rows are then read up to the last row
+        in the sheet data.
+        """
+        with self._workbook(file_path) as wb:
+            ws = wb[sheet_name]
+            ws.reset_dimensions()
+            return list(ws.iter_rows(values_only=True))
+
+    def _sheet_rows(self, file_path: str, sheet_name: str) -> list[tuple[Any, ...]]:
+        """All rows of a sheet, cached process-wide per file version.
+
+        Read with calamine when installed, otherwise with openpyxl, and
+        normalized by _sheet_grid so both readers give the same rows. Callers
+        must not mutate the returned list.
+        """
+        stat = Path(file_path).stat()
+        cache_key = (file_path, stat.st_mtime_ns, stat.st_size, sheet_name)
+        with _rows_cache_lock:
+            rows = _sheet_rows_cache.get(cache_key)
+            if rows is not None:
+                _sheet_rows_cache.move_to_end(cache_key)
+                return rows
+        
+        raw_rows = self._read_calamine_sheet(file_path, sheet_name) if CALAMINE_AVAILABLE else None
+        if raw_rows is None:
+            raw_rows = self._read_openpyxl_sheet(file_path, sheet_name)
+        rows = _sheet_grid(raw_rows)
+        
+        with _rows_cache_lock:
+            _sheet_rows_cache[cache_key] = rows
+            if len(_sheet_rows_cache) > SHEET_ROWS_CACHE_SIZE:
+                _sheet_rows_cache.popitem(last=False)
+        return rows
+
+    def _iter_sheet_rows(
+        self,
+        file_path: str,
+        sheet_name: str,
+        min_row: int = 1,
+        max_row: int | None = None,
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yield cell values for rows min_row..max_row (1-based) of a sheet.
+
+        Rows come from the shared sheet cache; empty cells are None.
+        """
+        rows = self._sheet_rows(file_path, sheet_name)
+        yield from islice(rows, max(min_row, 1) - 1, max_row)
+
+    def _preload_sheet_rows(self, file_path: str, sheet_names: Iterable[str]) -> None:
+        """Fill the shared row cache for several sheets concurrently.
+
+        Used before mappings spanning more than one sheet are resolved, so the
+        sheets are parsed side by side instead of one after another.
+        """
+        names = list(dict.fromkeys(sheet_names))
+        if len(names) <= 1:
+            return
+        workers = min(MAX_METADATA_WORKERS, len(names))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda name: self._sheet_rows(file_path, name), names))
+
+    def _headers_key(self, file_path: str, sheet_name: str) -> tuple[str, float, str]:
+        return (file_path, Path(file_path).stat().st_mtime, sheet_name)
+
+    def _sheet_headers(self, file_path: str, sheet_name: str) -> tuple[list[str], dict[str, int]]:
+        """Column names of a sheet's first row and their positions, cached per file version."""
+        cache_key = self._headers_key(file_path, sheet_name)
+        cached = self._headers_cache.get(cache_key)
+        if cached is None:
+            headers = _excel_headers(next(self._iter_sheet_rows(file_path, sheet_name, max_row=1), ()))
+            cached = (headers, _mapping_header_index(headers))
+            self._headers_cache[cache_key] = cached
+        return cached
 
     def _is_csv(self, file_path: str) -> bool:
         """Check if file is a CSV based on extension."""
         return Path(file_path).suffix.lower() in CSV_EXTENSIONS
 
-    def get_file_metadata(self, file_path: str) -> list[SheetMetadata]:
+    @contextmanager
+    def _open_csv(
+        self,
+        file_path: str,
+        dialect: type[csv.Dialect] | None = None,
+    ) -> Iterator[tuple[Iterable[str], type[csv.Dialect]]]:
+        """Open a CSV once for both dialect detection and parsing.
+
+        A caller-supplied dialect is used as is; otherwise it is detected from
+        a sample read off the same handle. The sample is completed to a line
+        boundary and chained back in front of the handle, so the yielded
+        lines start at the top of the file without rewinding it.
+        """
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            lines: Iterable[str] = f
+            if dialect is None:
+                sample = f.read(CSV_SNIFF_BYTES) + f.readline()
+                dialect = self._detect_dialect(file_path, sample)
+                lines = chain(io.StringIO(sample, newline=''), f)
+            yield lines, dialect
+
+    def _cached_csv_rows(
+        self,
+        file_path: str,
+        dialect: type[csv.Dialect] | None = None,
+    ) -> list[list[str]] | None:
+        """Rows of a CSV from the shared cache, or None if not parsed yet."""
+        stat = Path(file_path).stat()
+        cache_key = (file_path, stat.st_mtime_ns, stat.st_size, dialect)
+        with _rows_cache_lock:
+            rows = _csv_rows_cache.get(cache_key)
+            if rows is not None:
+                _csv_rows_cache.move_to_end(cache_key)
+            return rows
+
+    def _csv_rows(
+        self,
+        file_path: str,
+        dialect: type[csv.Dialect] | None = None,
+    ) -> list[list[str]]:
+        """All rows of a CSV file (header first), cached process-wide per file version.
+
+        Shared by the markdown, extract and count paths so one request parses
+        the file once. Callers must not mutate the returned rows.
+        """
+        rows = self._cached_csv_rows(file_path, dialect)
+        if rows is not None:
+            return rows
+        
+        stat = Path(file_path).stat()
+        cache_key = (file_path, stat.st_mtime_ns, stat.st_size, dialect)
+        with self._open_csv(file_path, dialect) as (lines, dialect):
+            reader = csv.reader(lines, dialect)
+            rows = None
+            if PYARROW_AVAILABLE and stat.st_size >= CSV_ARROW_ROWS_MIN_BYTES:
+                header = next(reader, None)
+                if header:
+                    rows = self._read_csv_rows_arrow(file_path, dialect, len(header))
+                if rows is None and header is not None:
+                    # Arrow declined: keep parsing after the header already read
+                    rows = [header]
+                    rows.extend(reader)
+            if rows is None:
+                rows = list(reader)
+        
+        with _rows_cache_lock:
+            _csv_rows_cache[cache_key] = rows
+            if len(_csv_rows_cache) > CSV_ROWS_CACHE_SIZE:
+                _csv_rows_cache.popitem(last=False)
+        return rows
+
+    def _read_csv_rows_arrow(
+        self,
+        file_path: str,
+        dialect: type[csv.Dialect],
+        num_columns: int,
+    ) -> list[list[str]] | None:
+        """Parse a large CSV with pyarrow and pivot it to csv-module style rows.
+
+        Empty lines are kept so row numbers match csv.reader. Returns None when
+        Arrow cannot parse the file (e.g. ragged or blank rows), so the caller
+        can fall back to the csv module.
+        """
+        try:
+            table = _arrow_read_csv(file_path, dialect, num_columns, ignore_empty_lines=False)
+        except pa.ArrowInvalid as e:
+            logger.info(f"Arrow could not parse '{file_path}', using csv module: {e}")
+            return None
+        columns = [column.to_pylist() for column in table.columns]
+        return [list(row) for row in zip(*columns)]
+
+    def _detect_dialect(self, file_path: str, sample: str) -> type[csv.Dialect]:
+        """Detect the CSV dialect once per file version, defaulting to csv.excel.
+
+        The header line decides directly when it has no quotes and one candidate
+        delimiter is strictly the most frequent and occurs as often on the second
+        line, or when it contains only one candidate delimiter; csv.Sniffer is
+        run for the remaining ambiguous headers.
+        """
+        cache_key = (file_path, Path(file_path).stat().st_mtime)
+        dialect = self._dialect_cache.get(cache_key)
+        if dialect is not None:
+            return dialect
+        
+        first_line, _, rest = sample.partition("\n")
+        counts = {delimiter: first_line.count(delimiter) for delimiter in CSV_FAST_DIALECTS}
+        present = [delimiter for delimiter, count in counts.items() if count]
+        delimiter, runner_up = sorted(counts, key=counts.__getitem__, reverse=True)[:2]
+        if (
+            counts[delimiter] > counts[runner_up]
+            and '"' not in first_line
+            and rest.partition("\n")[0].count(delimiter) == counts[delimiter]
+        ):
+            dialect = CSV_FAST_DIALECTS[delimiter]
+        elif len(present) == 1:
+            dialect = CSV_FAST_DIALECTS[present[0]]
+        else:
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=CSV_SNIFF_DELIMITERS)
+            except csv.Error:
+                dialect = csv.excel
+        
+        self._dialect_cache[cache_key] = dialect
+        return dialect
+
+    def get_file_metadata(
+        self,
+        file_path: str,
+        sheet_names: Iterable[str] | None = None,
+        dialect: type[csv.Dialect] | None = None,
+    ) -> list[SheetMetadata]:
         """
         Extract metadata from an Excel or CSV file.
 
         Returns sheet names, column headers, row counts, and sample data.
+        For Excel files, sheet_names limits the scan to those sheets.
+        For CSV files, a known dialect skips delimiter detection.
+        """
+        if self._is_csv(file_path):
+            return self._get_csv_metadata(file_path, dialect)
+        return self._get_excel_metadata(file_path, sheet_names)
+
+    def get_sheet_max_rows(
+        self,
+        file_path: str,
+        sheet_names: Iterable[str] | None = None,
+    ) -> dict[str, int]:
+        """
+        Return the 1-based number of the last row of each sheet (header included).
+
+        Reads from the shared row caches, so it costs nothing extra when the
+        sheets are also converted or extracted. For CSV files the single sheet
+        is named after the file.
         """
         if self._is_csv(file_path):
-            return self._get_csv_metadata(file_path)
-        return self._get_excel_metadata(file_path)
+            return {Path(file_path).stem: len(self._csv_rows(file_path))}
+        
+        names = self._sheet_names(file_path)
+        if sheet_names is not None:
+            wanted = set(sheet_names)
+            names = [name for name in names if name in wanted]
+        return {name: len(self._sheet_rows(file_path, name)) for name in names}
 
-    def _get_csv_metadata(self, file_path: str) -> list[SheetMetadata]:
+    def _get_csv_metadata(
+        self,
+        file_path: str,
+        dialect: type[csv.Dialect] | None = None,
+    ) -> list[SheetMetadata]:
         """Extract metadata from a CSV file."""
         # CSV files have a single "sheet" named after the file
         file_name = Path(file_path).stem
         
-        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
-            # Detect dialect
-            sample = f.read(8192)
-            f.seek(0)
-            try:
-                dialect = csv.Sniffer().sniff(sample)
-            except csv.Error:
-                dialect = csv.excel
-            
-            reader = csv.reader(f, dialect)
-            rows = list(reader)
+        # Count non-empty rows (excluding header) and keep the first 30 rows for
+        # sampling. Reuse the rows if another parser method already parsed the
+        # file; otherwise scan with Arrow's columnar reader when available, or
+        # stream the data rows once.
+        cached_rows = self._cached_csv_rows(file_path, dialect)
+        if cached_rows is not None:
+            header = cached_rows[0] if cached_rows else None
+            row_count = sum(1 for row in islice(cached_rows, 1, None) if any(map(str.strip, row)))
+            sample_rows = cached_rows[1:MAX_SAMPLE_ROWS + 1]
+        else:
+            with self._open_csv(file_path, dialect) as (lines, dialect):
+                reader = csv.reader(lines, dialect)
+                header = next(reader, None)
+                scanned = None
+                if header is not None and PYARROW_AVAILABLE:
+                    scanned = self._scan_csv_arrow(file_path, dialect, len(header))
+                if scanned is not None:
+                    row_count, sample_rows = scanned
+                else:
+                    row_count = 0
+                    sample_rows = []
+                    for data_idx, row in enumerate(reader):
+                        if any(map(str.strip, row)):
+                            row_count += 1
+                        if data_idx < MAX_SAMPLE_ROWS:
+                            sample_rows.append(row)
         
-        if not rows:
+        if header is None:
             return [SheetMetadata(name=file_name, columns=[], row_count=0, sample_data=[])]
         
         # First row is headers
         columns = []
-        for col_idx, value in enumerate(rows[0]):
+        for col_idx, value in enumerate(header):
             if value and value.strip():
                 columns.append(value.strip())
             else:
                 # Use 0-based column index to match markitdown format
                 columns.append(f"Unnamed: {col_idx}")
         
-        # Count data rows (excluding header)
-        data_rows = rows[1:]
-        row_count = sum(1 for row in data_rows if any(cell.strip() for cell in row if cell))
-        
-        # Get sample data (first 30 rows, first 10 columns, truncate long values)
-        MAX_SAMPLE_ROWS = 30
-        MAX_SAMPLE_COLS = 10
-        MAX_CELL_LENGTH = 200
+        # Sample data (first 30 rows, first 10 columns, truncate long values)
         sample_data = []
-        for row in data_rows[:MAX_SAMPLE_ROWS]:
+        for row in sample_rows:
             row_data = {}
             for col_idx, value in enumerate(row):
                 if col_idx >= MAX_SAMPLE_COLS:
                     break  # Only include first 10 columns
                 if col_idx < len(columns):
-                    if value and value.strip():
-                        cell_str = value.strip()
+                    cell_str = value.strip()
+                    if cell_str:
                         if len(cell_str) > MAX_CELL_LENGTH:
                             cell_str = cell_str[:MAX_CELL_LENGTH] + "..."
                         row_data[columns[col_idx]] = cell_str
@@ -101,140 +692,195 @@ class ExcelParser:
             )
         ]
 
-    def _get_excel_metadata(self, file_path: str) -> list[SheetMetadata]:
-        """Extract metadata from an Excel file."""
-        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        sheets_metadata = []
+    def _scan_csv_arrow(
+        self,
+        file_path: str,
+        dialect: type[csv.Dialect],
+        num_columns: int,
+    ) -> tuple[int, list[list[str]]] | None:
+        """Count non-empty data rows and read the sample rows with pyarrow.
 
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
+        Every column is read as a string so the result matches the csv module.
+        Returns None when Arrow cannot parse the file (e.g. ragged rows), so the
+        caller can fall back to the streaming csv reader.
+        """
+        if num_columns == 0:
+            return None
+        
+        try:
+            table = _arrow_read_csv(file_path, dialect, num_columns, skip_rows=1)
+        except pa.ArrowInvalid as e:
+            logger.info(f"Arrow could not parse '{file_path}', using csv module: {e}")
+            return None
+        
+        # A row counts when any of its cells has non-whitespace text
+        non_empty = None
+        for column in table.columns:
+            has_text = pc.not_equal(pc.utf8_trim_whitespace(column), "")
+            non_empty = has_text if non_empty is None else pc.or_(non_empty, has_text)
+        row_count = pc.sum(non_empty).as_py() or 0
+        
+        sample_rows = [
+            list(row.values()) for row in table.slice(0, MAX_SAMPLE_ROWS).to_pylist()
+        ]
+        return row_count, sample_rows
 
-            # Get column headers (first row)
-            columns = []
-            for col_idx, cell in enumerate(ws[1]):
-                if cell.value is not None:
-                    columns.append(str(cell.value))
-                else:
-                    # Use 0-based column index to match markitdown format
-                    columns.append(f"Unnamed: {col_idx}")
-
-            # Count rows (excluding header)
-            row_count = 0
-            for row in ws.iter_rows(min_row=2):
-                if any(cell.value is not None for cell in row):
-                    row_count += 1
-
-            # Get sample data (first 30 rows, first 10 columns, truncate long values)
-            MAX_SAMPLE_ROWS = 30
-            MAX_SAMPLE_COLS = 10
-            MAX_CELL_LENGTH = 200  # Truncate long cell values
-            sample_data = []
-            for row_idx, row in enumerate(ws.iter_rows(min_row=2, max_row=MAX_SAMPLE_ROWS + 1)):
-                row_data = {}
-                for col_idx, cell in enumerate(row):
-                    if col_idx >= MAX_SAMPLE_COLS:
-                        break  # Only include first 10 columns
-                    if col_idx < len(columns):
-                        if cell.value is not None:
-                            cell_str = str(cell.value)
-                            if len(cell_str) > MAX_CELL_LENGTH:
-                                cell_str = cell_str[:MAX_CELL_LENGTH] + "..."
-                            row_data[columns[col_idx]] = cell_str
-                        else:
-                            row_data[columns[col_idx]] = None
-                if any(v is not None for v in row_data.values()):
-                    sample_data.append(row_data)
-
-            sheets_metadata.append(
-                SheetMetadata(
-                    name=sheet_name,
-                    columns=columns,
-                    row_count=row_count,
-                    sample_data=sample_data,
-                )
-            )
+    def _get_excel_metadata(
+        self,
+        file_path: str,
+        sheet_names: Iterable[str] | None = None,
+    ) -> list[SheetMetadata]:
+        """Extract metadata from an Excel file.
 
-        wb.close()
-        return sheets_metadata
+        Only the requested sheets are read when sheet_names is given. Sheets are
+        scanned concurrently, and results keep workbook order.
+        """
+        all_sheet_names = self._sheet_names(file_path)
+        if sheet_names is not None:
+            wanted = set(sheet_names)
+            all_sheet_names = [name for name in all_sheet_names if name in wanted]
+        
+        if len(all_sheet_names) <= 1:
+            return [self._sheet_metadata(file_path, name) for name in all_sheet_names]
+        
+        workers = min(MAX_METADATA_WORKERS, len(all_sheet_names))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda name: self._sheet_metadata(file_path, name), all_sheet_names))
+
+    def _sheet_metadata(self, file_path: str, sheet_name: str) -> SheetMetadata:
+        """Read the header, non-empty row count and sample rows of one sheet."""
+        # One streaming pass per sheet: header row, then data rows
+        rows = self._iter_sheet_rows(file_path, sheet_name)
 
-    def convert_to_markdown(self, file_path: str) -> str:
+        # Get column headers (first row)
+        columns = _excel_headers(next(rows, ()))
+        self._headers_cache[self._headers_key(file_path, sheet_name)] = (columns, _mapping_header_index(columns))
+
+        # Count rows (excluding header) and sample the first 30 rows
+        # (first 10 columns, truncate long values)
+        row_count = 0
+        sample_data = []
+        for data_idx, row in enumerate(rows):
+            if row.count(None) != len(row):
+                row_count += 1
+            if data_idx >= MAX_SAMPLE_ROWS:
+                continue
+            row_data = {}
+            for col_idx, value in enumerate(row):
+                if col_idx >= MAX_SAMPLE_COLS:
+                    break  # Only include first 10 columns
+                if col_idx < len(columns):
+                    if value is not None:
+                        cell_str = str(value)
+                        if len(cell_str) > MAX_CELL_LENGTH:
+                            cell_str = cell_str[:MAX_CELL_LENGTH] + "..."
+                        row_data[columns[col_idx]] = cell_str
+                    else:
+                        row_data[columns[col_idx]] = None
+            if any(v is not None for v in row_data.values()):
+                sample_data.append(row_data)
+
+        return SheetMetadata(
+            name=sheet_name,
+            columns=columns,
+            row_count=row_count,
+            sample_data=sample_data,
+        )
+
+    def convert_to_markdown(
+        self,
+        file_path: str,
+        dialect: type[csv.Dialect] | None = None,
+    ) -> str:
         """
         Convert Excel or CSV file to Markdown.
 
-        For Excel: Uses MarkItDown
-        For CSV: Uses custom conversion to markdown table
+        For Excel: One markdown table per sheet, under a ``## SheetName`` heading
+        For CSV: Uses custom conversion to markdown table (a known dialect
+        skips delimiter detection)
 
         This is used by Approach 1 (Auto LLM).
         """
         if self._is_csv(file_path):
-            return self._convert_csv_to_markdown(file_path)
+            return self._convert_csv_to_markdown(file_path, dialect)
         
         return self._convert_excel_to_markdown(file_path)
 
-    def _convert_csv_to_markdown(self, file_path: str) -> str:
+    def _convert_csv_to_markdown(
+        self,
+        file_path: str,
+        dialect: type[csv.Dialect] | None = None,
+    ) -> str:
         """Convert CSV file to Markdown table format."""
-        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
-            # Detect dialect
-            sample = f.read(8192)
-            f.seek(0)
-            try:
-                dialect = csv.Sniffer().sniff(sample)
-            except csv.Error:
-                dialect = csv.excel
-            
-            reader = csv.reader(f, dialect)
-            rows = list(reader)
-        
+        buf = io.StringIO()
+        write = buf.write
+        rows = self._csv_rows(file_path, dialect)
         if not rows:
             return ""
-        
-        # Build markdown table
-        lines = []
-        file_name = Path(file_path).stem
-        lines.append(f"# {file_name}\n")
+        headers = rows[0]
         
         # Header row
-        headers = rows[0]
-        lines.append("| " + " | ".join(h if h else "-" for h in headers) + " |")
-        lines.append("| " + " | ".join("---" for _ in headers) + " |")
+        file_name = Path(file_path).stem
+        num_cols = len(headers)
+        write(f"# {file_name}\n\n")
+        write("| " + " | ".join(h.translate(MD_ESCAPE) if h else "-" for h in headers) + " |\n")
+        write("| " + " | ".join("---" for _ in headers) + " |")
         
-        # Data rows
-        for row in rows[1:]:
+        # Data rows, written straight into the buffer
+        for row in islice(rows, 1, None):
             # Pad row to match header length
-            padded_row = row + [""] * (len(headers) - len(row))
-            # Clean values
-            clean_values = []
-            for val in padded_row[:len(headers)]:
-                if val and val.strip():
-                    # Escape pipe characters and clean whitespace
-                    clean_val = val.strip().replace("|", "\\|").replace("\n", " ")
-                    clean_values.append(clean_val)
-                else:
-                    clean_values.append("-")
-            lines.append("| " + " | ".join(clean_values) + " |")
-        
-        markdown_text = "\n".join(lines)
+            padded_row = row + [""] * (num_cols - len(row))
+            # Escape pipe characters and clean whitespace
+            clean_values = [
+                val.strip().translate(MD_ESCAPE) if val and val.strip() else "-"
+                for val in padded_row[:num_cols]
+            ]
+            write("\n| " + " | ".join(clean_values) + " |")
+    
+        markdown_text = buf.getvalue()
         logger.info(f"CSV converted to {len(markdown_text)} characters of markdown")
         return markdown_text
 
     def _convert_excel_to_markdown(self, file_path: str) -> str:
-        """Convert Excel file to Markdown using MarkItDown."""
-        result = self.markitdown.convert(file_path)
-
-        if result and hasattr(result, "text_content"):
-            markdown_text = result.text_content
-
-            # Clean up NaN values
-            markdown_text = markdown_text.replace(" NaN ", " - ")
-            markdown_text = markdown_text.replace("| NaN |", "| - |")
-            markdown_text = markdown_text.replace("\nNaN\n", "\n-\n")
-            markdown_text = markdown_text.replace("NaN", "-")
+        """Convert Excel file to Markdown, one ``## SheetName`` table per sheet.
 
-            logger.info(f"MarkItDown extracted {len(markdown_text)} characters")
-            return markdown_text
-
-        logger.warning("MarkItDown returned empty result")
-        return ""
+        Mirrors the layout MarkItDown produced (first row as header, "Unnamed: N"
+        for blank headers) but reads the shared sheet rows directly and writes
+        "-" for empty cells instead of post-processing "NaN" out of the text.
+        """
+        buf = io.StringIO()
+        write = buf.write
+        for sheet_idx, sheet_name in enumerate(self._sheet_names(file_path)):
+            # Drop trailing empty cells and fully empty rows
+            rows = []
+            for row in self._iter_sheet_rows(file_path, sheet_name):
+                width = len(row)
+                while width and row[width - 1] is None:
+                    width -= 1
+                if width:
+                    rows.append(row[:width])
+            
+            if sheet_idx:
+                write("\n\n")
+            write(f"## {sheet_name}")
+            if rows:
+                num_cols = max(len(row) for row in rows)
+                header = rows[0]
+                header_cells = [
+                    _md_cell(header[col_idx]) if col_idx < len(header) and header[col_idx] is not None
+                    else f"Unnamed: {col_idx}"
+                    for col_idx in range(num_cols)
+                ]
+                write("\n| " + " | ".join(header_cells) + " |")
+                write("\n| " + " | ".join("---" for _ in header_cells) + " |")
+                for row in islice(rows, 1, None):
+                    cells = [_md_cell(value) for value in row]
+                    cells.extend("-" for _ in range(num_cols - len(cells)))
+                    write("\n| " + " | ".join(cells) + " |")
+        
+        markdown_text = buf.getvalue()
+        logger.info(f"Excel converted to {len(markdown_text)} characters of markdown")
+        return markdown_text
 
     def generate_filtered_markdown(
         self,
@@ -246,6 +892,7 @@ class ExcelParser:
         max_rows: int = 100,
         header_row: int = 1,
         column_indices: list[int] | None = None,
+        dialect: type[csv.Dialect] | None = None,
     ) -> str:
         """
         Generate markdown table with only specified columns.
@@ -264,13 +911,14 @@ class ExcelParser:
                 these take priority over name-based column lookup for Excel files.
                 This handles the mismatch between pandas column names (from Step 1)
                 and openpyxl header row column names (used in Step 3).
+            dialect: Optional known CSV dialect; skips delimiter detection.
             
         Returns:
             Markdown table string with filtered columns
         """
         if self._is_csv(file_path):
             return self._generate_filtered_markdown_csv(
-                file_path, sheet_name, columns, start_row, end_row, max_rows
+                file_path, sheet_name, columns, start_row, end_row, max_rows, dialect
             )
         return self._generate_filtered_markdown_excel(
             file_path, sheet_name, columns, start_row, end_row, max_rows, header_row,
@@ -285,6 +933,7 @@ class ExcelParser:
         start_row: int,
         end_row: int | None,
         max_rows: int,
+        dialect: type[csv.Dialect] | None = None,
     ) -> str:
         """Generate filtered markdown from CSV file."""
         file_name = Path(file_path).stem
@@ -294,17 +943,7 @@ class ExcelParser:
             logger.warning(f"Sheet '{sheet_name}' not found in CSV (has '{file_name}')")
             return ""
         
-        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
-            sample = f.read(8192)
-            f.seek(0)
-            try:
-                dialect = csv.Sniffer().sniff(sample)
-            except csv.Error:
-                dialect = csv.excel
-            
-            reader = csv.reader(f, dialect)
-            rows = list(reader)
-        
+        rows = self._csv_rows(file_path, dialect)
         if not rows:
             return ""
         
@@ -317,16 +956,18 @@ class ExcelParser:
                 all_headers.append(f"Unnamed: {col_idx}")
         
         # Find indices of requested columns
+        header_index = _header_index(all_headers)
+        header_index_lower = _header_index_lower(all_headers)
         col_indices = []
         filtered_headers = []
         for col_name in columns:
-            if col_name in all_headers:
-                idx = all_headers.index(col_name)
+            idx = header_index.get(col_name)
+            if idx is not None:
                 col_indices.append(idx)
                 filtered_headers.append(col_name)
             else:
                 # Fallback: handle "Unnamed: N" style columns by positional index
-                unnamed_match = re.match(r"^Unnamed:\s*(\d+)$", col_name)
+                unnamed_match = col_name.startswith("Unnamed:") and UNNAMED_COLUMN_RE.fullmatch(col_name)
                 if unnamed_match:
                     positional_idx = int(unnamed_match.group(1))
                     if positional_idx < len(all_headers):
@@ -338,12 +979,10 @@ class ExcelParser:
                         )
                 else:
                     # Try case-insensitive match
-                    col_name_lower = col_name.lower().strip()
-                    for h_idx, h in enumerate(all_headers):
-                        if h.lower().strip() == col_name_lower:
-                            col_indices.append(h_idx)
-                            filtered_headers.append(all_headers[h_idx])
-                            break
+                    h_idx = header_index_lower.get(col_name.lower().strip())
+                    if h_idx is not None:
+                        col_indices.append(h_idx)
+                        filtered_headers.append(all_headers[h_idx])
         
         if not col_indices:
             logger.warning(f"No matching columns found in CSV for: {columns}")
@@ -353,38 +992,23 @@ class ExcelParser:
         lines = []
         
         # Header row
-        lines.append("| Row | " + " | ".join(filtered_headers) + " |")
+        lines.append("| Row | " + " | ".join(h.translate(MD_ESCAPE) for h in filtered_headers) + " |")
         lines.append("| --- | " + " | ".join("---" for _ in filtered_headers) + " |")
         
-        # Data rows
-        data_rows = rows[1:]
+        # Data rows (rows[0] is the header)
+        num_data_rows = len(rows) - 1
         actual_start = max(0, start_row - 2)  # Convert to 0-based index
-        actual_end = min(len(data_rows), (end_row - 1) if end_row else len(data_rows))
+        actual_end = min(num_data_rows, (end_row - 1) if end_row else num_data_rows)
         
-        rows_added = 0
-        for data_idx in range(actual_start, actual_end):
-            if rows_added >= max_rows:
-                break
-            
-            row = data_rows[data_idx]
-            row_num = data_idx + 2  # 1-based row number (accounting for header)
-            
+        # Every CSV row is emitted, so max_rows bounds the slice up front
+        actual_end = min(actual_end, actual_start + max_rows)
+        for row_num, row in enumerate(islice(rows, actual_start + 1, actual_end + 1), start=actual_start + 2):
             # Extract values for filtered columns
-            values = []
-            for col_idx in col_indices:
-                if col_idx < len(row):
-                    val = row[col_idx]
-                    if val and val.strip():
-                        # Escape pipe characters and clean whitespace
-                        clean_val = val.strip().replace("|", "\\|").replace("\n", " ")
-                        values.append(clean_val)
-                    else:
-                        values.append("-")
-                else:
-                    values.append("-")
+            row_len = len(row)
+            values = [_md_cell(row[col_idx]) if col_idx < row_len else "-" for col_idx in col_indices]
             
-            lines.append(f"| {row_num} | " + " | ".join(values) + " |")
-            rows_added += 1
+            lines.append(f"| {row_num} | {' | '.join(values)} |")
+        rows_added = max(0, actual_end - actual_start)
         
         markdown_text = "\n".join(lines)
         logger.info(f"Generated filtered markdown: {len(filtered_headers)} columns, {rows_added} rows")
@@ -402,23 +1026,14 @@ class ExcelParser:
         column_indices: list[int] | None = None,
     ) -> str:
         """Generate filtered markdown from Excel file."""
-        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        
-        if sheet_name not in wb.sheetnames:
+        if sheet_name not in self._sheet_names(file_path):
             logger.warning(f"Sheet '{sheet_name}' not found in workbook")
-            wb.close()
             return ""
         
-        ws = wb[sheet_name]
-        
         # Get column headers from specified header row
-        all_headers = []
-        header_row_data = list(ws[header_row])
-        for col_idx, cell in enumerate(header_row_data):
-            if cell.value is not None:
-                all_headers.append(str(cell.value))
-            else:
-                all_headers.append(f"Unnamed: {col_idx}")
+        all_headers = _excel_headers(
+            next(self._iter_sheet_rows(file_path, sheet_name, min_row=header_row, max_row=header_row), ())
+        )
         
         # Resolve column indices.
         # Priority: use pre-resolved indices from caller (avoids pandas/openpyxl name mismatch),
@@ -447,15 +1062,17 @@ class ExcelParser:
         
         # Fall back to name-based lookup if no pre-resolved indices or none matched
         if not col_indices:
+            header_index = _header_index(all_headers)
+            header_index_lower = _header_index_lower(all_headers)
             for col_name in columns:
-                if col_name in all_headers:
+                idx = header_index.get(col_name)
+                if idx is not None:
                     # Direct match found
-                    idx = all_headers.index(col_name)
                     col_indices.append(idx)
                     filtered_headers.append(all_headers[idx])
                 else:
                     # Fallback: handle "Unnamed: N" style columns from pandas
-                    unnamed_match = re.match(r"^Unnamed:\s*(\d+)$", col_name)
+                    unnamed_match = col_name.startswith("Unnamed:") and UNNAMED_COLUMN_RE.fullmatch(col_name)
                     if unnamed_match:
                         positional_idx = int(unnamed_match.group(1))
                         if positional_idx < len(all_headers):
@@ -472,19 +1089,15 @@ class ExcelParser:
                             )
                     else:
                         # Try case-insensitive match as a last resort
-                        col_name_lower = col_name.lower().strip()
-                        matched = False
-                        for h_idx, h in enumerate(all_headers):
-                            if h.lower().strip() == col_name_lower:
-                                col_indices.append(h_idx)
-                                filtered_headers.append(all_headers[h_idx])
-                                logger.info(
-                                    f"Column '{col_name}' matched case-insensitively to '{all_headers[h_idx]}' "
-                                    f"in sheet '{sheet_name}'"
-                                )
-                                matched = True
-                                break
-                        if not matched:
+                        h_idx = header_index_lower.get(col_name.lower().strip())
+                        if h_idx is not None:
+                            col_indices.append(h_idx)
+                            filtered_headers.append(all_headers[h_idx])
+                            logger.info(
+                                f"Column '{col_name}' matched case-insensitively to '{all_headers[h_idx]}' "
+                                f"in sheet '{sheet_name}'"
+                            )
+                        else:
                             logger.warning(
                                 f"Column '{col_name}' not found in sheet '{sheet_name}' "
                                 f"header row {header_row}. Available: {all_headers}"
@@ -492,7 +1105,6 @@ class ExcelParser:
         
         if not col_indices:
             logger.warning(f"No matching columns found in sheet '{sheet_name}' for: {columns}")
-            wb.close()
             return ""
         
         # Build markdown table
@@ -503,53 +1115,38 @@ class ExcelParser:
         for col_idx in col_indices:
             header_text = all_headers[col_idx]
             # Escape pipe characters
-            header_text = header_text.replace("|", "\\|").replace("\n", " ")
+            header_text = header_text.translate(MD_ESCAPE)
             display_headers.append(header_text)
         
         lines.append("| Row | " + " | ".join(display_headers) + " |")
         lines.append("| --- | " + " | ".join("---" for _ in display_headers) + " |")
         
-        # Data rows
+        # Data rows, read in one sequential pass
         actual_start = max(start_row, header_row + 1)  # Start after header
-        actual_end = end_row if end_row else ws.max_row
+        rows = self._iter_sheet_rows(file_path, sheet_name, min_row=actual_start, max_row=end_row)
         
         rows_added = 0
-        for row_idx in range(actual_start, actual_end + 1):
+        for row_idx, row in enumerate(rows, start=actual_start):
             if rows_added >= max_rows:
                 break
             
-            row = list(ws[row_idx])
+            # Extract values for filtered columns, truncating very long values
+            row_len = len(row)
+            values = [
+                _md_cell(row[col_idx], FILTERED_MAX_CELL_LENGTH) if col_idx < row_len else "-"
+                for col_idx in col_indices
+            ]
             
-            # Extract values for filtered columns
-            values = []
-            has_content = False
-            for col_idx in col_indices:
-                if col_idx < len(row):
-                    cell = row[col_idx]
-                    if cell.value is not None:
-                        val = str(cell.value).strip()
-                        if val:
-                            has_content = True
-                            # Escape pipe characters and clean whitespace
-                            clean_val = val.replace("|", "\\|").replace("\n", " ")
-                            # Truncate very long values
-                            if len(clean_val) > 500:
-                                clean_val = clean_val[:500] + "..."
-                            values.append(clean_val)
-                        else:
-                            values.append("-")
-                    else:
-                        values.append("-")
-                else:
-                    values.append("-")
-            
-            # Only include rows that have some content
+            # Only include rows that have some content (a literal "-" cell counts)
+            has_content = any(value != "-" for value in values) or any(
+                row[col_idx] is not None and str(row[col_idx]).strip()
+                for col_idx in col_indices
+                if col_idx < row_len
+            )
             if has_content:
-                lines.append(f"| {row_idx} | " + " | ".join(values) + " |")
+                lines.append(f"| {row_idx} | {' | '.join(values)} |")
                 rows_added += 1
         
-        wb.close()
-        
         markdown_text = "\n".join(lines)
         logger.info(f"Generated filtered markdown for '{sheet_name}': {len(filtered_headers)} columns, {rows_added} rows")
         return markdown_text
@@ -558,48 +1155,46 @@ class ExcelParser:
         self,
         file_path: str,
         column_mappings: list[ColumnMapping],
+        dialect: type[csv.Dialect] | None = None,
     ) -> list[ExtractedQuestion]:
         """
         Extract questions deterministically from specified columns.
 
         This is used by Approaches 2 and 3.
         Returns raw extracted data without LLM processing.
+        For CSV files, a known dialect skips delimiter detection.
         """
         if self._is_csv(file_path):
-            return self._extract_rows_from_csv(file_path, column_mappings)
+            return self._extract_rows_from_csv(file_path, column_mappings, dialect)
         return self._extract_rows_from_excel(file_path, column_mappings)
 
     def _extract_rows_from_csv(
         self,
         file_path: str,
         column_mappings: list[ColumnMapping],
+        dialect: type[csv.Dialect] | None = None,
     ) -> list[ExtractedQuestion]:
         """Extract questions from CSV file."""
         file_name = Path(file_path).stem
         questions = []
         
-        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
-            sample = f.read(8192)
-            f.seek(0)
-            try:
-                dialect = csv.Sniffer().sniff(sample)
-            except csv.Error:
-                dialect = csv.excel
-            
-            reader = csv.reader(f, dialect)
-            rows = list(reader)
-        
+        rows = self._csv_rows(file_path, dialect)
         if not rows:
             return questions
+        header = rows[0]
         
         # Build column name mapping (same logic as _get_csv_metadata)
         headers = []
-        for col_idx, value in enumerate(rows[0]):
+        for col_idx, value in enumerate(header):
             if value and value.strip():
                 headers.append(value.strip())
             else:
-                headers.append(f"Column_{col_idx + 1}")
+                headers.append(f"Unnamed: {col_idx}")
+        header_index = _mapping_header_index(headers)
         
+        # Resolve every mapping up front so the data rows are scanned only once.
+        # Each plan collects its own questions to keep the per-mapping output order.
+        plans = []
         for mapping in column_mappings:
             # CSV files have a single "sheet" named after the file
             if mapping.sheet_name != file_name:
@@ -607,32 +1202,38 @@ class ExcelParser:
                 continue
             
             # Find column indices
-            col_indices = {}
-            for idx, col_name in enumerate(headers):
-                if col_name == mapping.question_column:
-                    col_indices["question"] = idx
-                if mapping.answer_column and col_name == mapping.answer_column:
-                    col_indices["answer"] = idx
-                if mapping.type_column and col_name == mapping.type_column:
-                    col_indices["type"] = idx
+            q_idx = header_index.get(mapping.question_column)
+            a_idx = header_index.get(mapping.answer_column) if mapping.answer_column else None
+            t_idx = header_index.get(mapping.type_column) if mapping.type_column else None
             
-            if "question" not in col_indices:
+            if q_idx is None:
                 logger.warning(
                     f"Question column '{mapping.question_column}' not found in '{mapping.sheet_name}'"
                 )
                 continue
             
-            # Extract rows (row indices are 1-based, header is row 1, data starts at row 2)
-            data_rows = rows[1:]
-            start_idx = mapping.start_row - 2  # Convert to 0-based index into data_rows
-            end_idx = (mapping.end_row - 1) if mapping.end_row else len(data_rows)
+            # Row indices are 1-based, header is row 1, data starts at row 2
+            start_idx = max(0, mapping.start_row - 2)  # 0-based index into data rows
+            end_idx = (mapping.end_row - 1) if mapping.end_row else None
+            plans.append((mapping, q_idx, a_idx, t_idx, start_idx, end_idx, []))
+        
+        # Skip rows before the earliest start and stop once every bounded
+        # mapping is past its last row
+        first_idx = min((plan[4] for plan in plans), default=0)
+        end_indices = [plan[5] for plan in plans]
+        last_idx = None if None in end_indices else max(end_indices, default=0)
+        
+        data_rows = islice(rows, first_idx + 1, None if last_idx is None else last_idx + 1)
+        for data_idx, row in enumerate(data_rows, start=first_idx):
+            row_idx = data_idx + 2  # Convert back to 1-based row number
             
-            for data_idx in range(max(0, start_idx), min(end_idx, len(data_rows))):
-                row = data_rows[data_idx]
-                row_idx = data_idx + 2  # Convert back to 1-based row number
+            row_len = len(row)
+            for mapping, q_idx, a_idx, t_idx, start_idx, end_idx, mapping_questions in plans:
+                if data_idx < start_idx or (end_idx is not None and data_idx >= end_idx):
+                    continue
                 
                 # Get question text
-                q_val = row[col_indices["question"]] if col_indices["question"] < len(row) else ""
+                q_val = row[q_idx] if q_idx < row_len else ""
                 question_text = q_val.strip() if q_val else ""
                 
                 if not question_text or question_text == "-":
@@ -640,43 +1241,24 @@ class ExcelParser:
                 
                 # Get answers if available
                 answers = None
-                if "answer" in col_indices and col_indices["answer"] < len(row):
-                    a_val = row[col_indices["answer"]]
+                if a_idx is not None and a_idx < row_len:
+                    a_val = row[a_idx]
                     if a_val and a_val.strip():
-                        answer_text = a_val
-                        if "|" in answer_text:
-                            answers = [a.strip() for a in answer_text.split("|")]
-                        elif "\n" in answer_text:
-                            answers = [a.strip() for a in answer_text.split("\n")]
-                        else:
-                            answers = [answer_text.strip()]
+                        answers = _split_answers(a_val)
                 
                 # Determine question type
                 question_type = QuestionType.OPEN_ENDED
-                if "type" in col_indices and col_indices["type"] < len(row):
-                    t_val = row[col_indices["type"]]
+                if t_idx is not None and t_idx < row_len:
+                    t_val = row[t_idx]
                     if t_val and t_val.strip():
-                        type_str = t_val.lower().strip()
-                        type_mapping = {
-                            "open": QuestionType.OPEN_ENDED,
-                            "open_ended": QuestionType.OPEN_ENDED,
-                            "single": QuestionType.SINGLE_CHOICE,
-                            "single_choice": QuestionType.SINGLE_CHOICE,
-                            "multiple": QuestionType.MULTIPLE_CHOICE,
-                            "multiple_choice": QuestionType.MULTIPLE_CHOICE,
-                            "grouped": QuestionType.GROUPED_QUESTION,
-                            "grouped_question": QuestionType.GROUPED_QUESTION,
-                            "yes_no": QuestionType.YES_NO,
-                            "yesno": QuestionType.YES_NO,
-                        }
-                        question_type = type_mapping.get(type_str, QuestionType.OPEN_ENDED)
+                        question_type = _question_type(t_val)
                 elif answers:
-                    if len(answers) == 2 and set(a.lower() for a in answers) <= {"yes", "no"}:
+                    if len(answers) == 2 and answers[0].lower() in YES_NO and answers[1].lower() in YES_NO:
                         question_type = QuestionType.YES_NO
                     else:
                         question_type = QuestionType.SINGLE_CHOICE
                 
-                questions.append(
+                mapping_questions.append(
                     ExtractedQuestion(
                         question_text=question_text,
                         question_type=question_type,
@@ -685,6 +1267,9 @@ class ExcelParser:
                         sheet_name=mapping.sheet_name,
                     )
                 )
+    
+        for plan in plans:
+            questions.extend(plan[6])
         
         logger.info(f"Extracted {len(questions)} questions from CSV columns")
         return questions
@@ -695,105 +1280,109 @@ class ExcelParser:
         column_mappings: list[ColumnMapping],
     ) -> list[ExtractedQuestion]:
         """Extract questions from Excel file."""
-        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
         questions = []
 
+        # Resolve every mapping up front and group the plans by sheet, so each
+        # sheet is streamed once even when several mappings target it.
+        # Each plan collects its own questions to keep the per-mapping output order.
+        sheet_names = self._sheet_names(file_path)
+        self._preload_sheet_rows(
+            file_path, (m.sheet_name for m in column_mappings if m.sheet_name in sheet_names)
+        )
+        plans = []
+        plans_by_sheet: dict[str, list[tuple]] = {}
         for mapping in column_mappings:
-            if mapping.sheet_name not in wb.sheetnames:
+            if mapping.sheet_name not in sheet_names:
                 logger.warning(f"Sheet '{mapping.sheet_name}' not found")
                 continue
 
-            ws = wb[mapping.sheet_name]
-
             # Find column indices - use same naming as get_file_metadata
-            header_row = list(ws[1])
-            col_indices = {}
-            for idx, cell in enumerate(header_row):
-                # Generate column name same way as get_file_metadata
-                if cell.value is not None:
-                    col_name = str(cell.value)
-                else:
-                    # Use 0-based column index to match markitdown format
-                    col_name = f"Unnamed: {idx}"
-                
-                if col_name == mapping.question_column:
-                    col_indices["question"] = idx
-                if mapping.answer_column and col_name == mapping.answer_column:
-                    col_indices["answer"] = idx
-                if mapping.type_column and col_name == mapping.type_column:
-                    col_indices["type"] = idx
-
-            if "question" not in col_indices:
+            _, header_index = self._sheet_headers(file_path, mapping.sheet_name)
+            q_idx = header_index.get(mapping.question_column)
+            a_idx = header_index.get(mapping.answer_column) if mapping.answer_column else None
+            t_idx = header_index.get(mapping.type_column) if mapping.type_column else None
+
+            if q_idx is None:
                 logger.warning(
                     f"Question column '{mapping.question_column}' not found in '{mapping.sheet_name}'"
                 )
                 continue
 
-            # Extract rows
-            start_row = mapping.start_row
-            end_row = mapping.end_row or ws.max_row
+            plan = (mapping, q_idx, a_idx, t_idx, mapping.start_row, mapping.end_row, [])
+            plans.append(plan)
+            plans_by_sheet.setdefault(mapping.sheet_name, []).append(plan)
 
-            for row_idx in range(start_row, end_row + 1):
-                row = list(ws[row_idx])
+        for sheet_name, sheet_plans in plans_by_sheet.items():
+            # One forward scan covering the union of the mappings' row ranges
+            # (rows are 1-based, so a lower start_row starts at the first row)
+            min_row = max(min(plan[4] for plan in sheet_plans), 1)
+            end_rows = [plan[5] for plan in sheet_plans]
+            max_row = None if None in end_rows else max(end_rows)
 
-                # Get question text
-                q_cell = row[col_indices["question"]] if col_indices["question"] < len(row) else None
-                question_text = str(q_cell.value).strip() if q_cell and q_cell.value else ""
+            # Plans sorted by start row become active when the scan reaches their
+            # start and are retired past their end, so each row only visits the
+            # mappings whose range covers it
+            pending = sorted(sheet_plans, key=lambda plan: plan[4])
+            next_plan = 0
+            active: list[tuple] = []
+            expires_after: int | None = None  # Earliest end row among active plans
 
-                if not question_text or question_text == "-":
+            rows = self._iter_sheet_rows(file_path, sheet_name, min_row=min_row, max_row=max_row)
+            for row_idx, row in enumerate(rows, start=min_row):
+                if next_plan < len(pending) and pending[next_plan][4] <= row_idx:
+                    while next_plan < len(pending) and pending[next_plan][4] <= row_idx:
+                        active.append(pending[next_plan])
+                        next_plan += 1
+                    expires_after = min((plan[5] for plan in active if plan[5] is not None), default=None)
+                if expires_after is not None and row_idx > expires_after:
+                    active = [plan for plan in active if plan[5] is None or plan[5] >= row_idx]
+                    expires_after = min((plan[5] for plan in active if plan[5] is not None), default=None)
+                if not active:
                     continue
 
-                # Get answers if available
-                answers = None
-                if "answer" in col_indices:
-                    a_cell = row[col_indices["answer"]] if col_indices["answer"] < len(row) else None
-                    if a_cell and a_cell.value:
-                        answer_text = str(a_cell.value)
-                        # Parse pipe-separated or newline-separated answers
-                        if "|" in answer_text:
-                            answers = [a.strip() for a in answer_text.split("|")]
-                        elif "\n" in answer_text:
-                            answers = [a.strip() for a in answer_text.split("\n")]
-                        else:
-                            answers = [answer_text.strip()]
+                row_len = len(row)
+                for mapping, q_idx, a_idx, t_idx, _, _, mapping_questions in active:
+                    # Get question text
+                    q_val = row[q_idx] if q_idx < row_len else None
+                    question_text = str(q_val).strip() if q_val else ""
 
-                # Determine question type
-                question_type = QuestionType.OPEN_ENDED
-                if "type" in col_indices:
-                    t_cell = row[col_indices["type"]] if col_indices["type"] < len(row) else None
-                    if t_cell and t_cell.value:
-                        type_str = str(t_cell.value).lower().strip()
-                        type_mapping = {
-                            "open": QuestionType.OPEN_ENDED,
-                            "open_ended": QuestionType.OPEN_ENDED,
-                            "single": QuestionType.SINGLE_CHOICE,
-                            "single_choice": QuestionType.SINGLE_CHOICE,
-                            "multiple": QuestionType.MULTIPLE_CHOICE,
-                            "multiple_choice": QuestionType.MULTIPLE_CHOICE,
-                            "grouped": QuestionType.GROUPED_QUESTION,
-                            "grouped_question": QuestionType.GROUPED_QUESTION,
-                            "yes_no": QuestionType.YES_NO,
-                            "yesno": QuestionType.YES_NO,
-                        }
-                        question_type = type_mapping.get(type_str, QuestionType.OPEN_ENDED)
-                elif answers:
-                    # Infer type from answers
-                    if len(answers) == 2 and set(a.lower() for a in answers) <= {"yes", "no"}:
-                        question_type = QuestionType.YES_NO
-                    else:
-                        question_type = QuestionType.SINGLE_CHOICE
+                    if not question_text or question_text == "-":
+                        continue
 
-                questions.append(
-                    ExtractedQuestion(
-                        question_text=question_text,
-                        question_type=question_type,
-                        answers=answers,
-                        row_index=row_idx,
-                        sheet_name=mapping.sheet_name,
+                    # Get answers if available
+                    answers = None
+                    if a_idx is not None:
+                        a_val = row[a_idx] if a_idx < row_len else None
+                        if a_val:
+                            # Parse pipe-separated or newline-separated answers
+                            answers = _split_answers(str(a_val))
+
+                    # Determine question type
+                    question_type = QuestionType.OPEN_ENDED
+                    if t_idx is not None:
+                        t_val = row[t_idx] if t_idx < row_len else None
+                        if t_val:
+                            question_type = _question_type(str(t_val))
+                    elif answers:
+                        # Infer type from answers
+                        if len(answers) == 2 and answers[0].lower() in YES_NO and answers[1].lower() in YES_NO:
+                            question_type = QuestionType.YES_NO
+                        else:
+                            question_type = QuestionType.SINGLE_CHOICE
+
+                    mapping_questions.append(
+                        ExtractedQuestion(
+                            question_text=question_text,
+                            question_type=question_type,
+                            answers=answers,
+                            row_index=row_idx,
+                            sheet_name=mapping.sheet_name,
+                        )
                     )
-                )
 
-        wb.close()
+        for plan in plans:
+            questions.extend(plan[6])
+
         logger.info(f"Extracted {len(questions)} questions from columns")
         return questions
 
@@ -801,72 +1390,61 @@ class ExcelParser:
         self,
         file_path: str,
         column_mappings: list[ColumnMapping],
+        dialect: type[csv.Dialect] | None = None,
     ) -> int:
         """
         Count non-empty rows in the specified question columns.
 
         Used for validation in Approaches 2 and 3.
+        For CSV files, a known dialect skips delimiter detection.
         """
         if self._is_csv(file_path):
-            return self._count_rows_in_csv(file_path, column_mappings)
+            return self._count_rows_in_csv(file_path, column_mappings, dialect)
         return self._count_rows_in_excel(file_path, column_mappings)
 
     def _count_rows_in_csv(
         self,
         file_path: str,
         column_mappings: list[ColumnMapping],
+        dialect: type[csv.Dialect] | None = None,
     ) -> int:
         """Count non-empty rows in CSV file."""
         file_name = Path(file_path).stem
         total_count = 0
         
-        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
-            sample = f.read(8192)
-            f.seek(0)
-            try:
-                dialect = csv.Sniffer().sniff(sample)
-            except csv.Error:
-                dialect = csv.excel
-            
-            reader = csv.reader(f, dialect)
-            rows = list(reader)
-        
+        rows = self._csv_rows(file_path, dialect)
         if not rows:
             return 0
+        header = rows[0]
         
         # Build column name mapping
         headers = []
-        for col_idx, value in enumerate(rows[0]):
+        for col_idx, value in enumerate(header):
             if value and value.strip():
                 headers.append(value.strip())
             else:
-                headers.append(f"Column_{col_idx + 1}")
+                headers.append(f"Unnamed: {col_idx}")
+        header_index = _mapping_header_index(headers)
         
         for mapping in column_mappings:
             if mapping.sheet_name != file_name:
                 continue
             
             # Find question column index
-            q_col_idx = None
-            for idx, col_name in enumerate(headers):
-                if col_name == mapping.question_column:
-                    q_col_idx = idx
-                    break
+            q_col_idx = header_index.get(mapping.question_column)
             
             if q_col_idx is None:
                 continue
             
-            # Count non-empty rows
-            data_rows = rows[1:]
-            start_idx = mapping.start_row - 2
-            end_idx = (mapping.end_row - 1) if mapping.end_row else len(data_rows)
-            
-            for data_idx in range(max(0, start_idx), min(end_idx, len(data_rows))):
-                row = data_rows[data_idx]
-                if q_col_idx < len(row):
-                    val = row[q_col_idx]
-                    if val and val.strip() and val.strip() != "-":
-                        total_count += 1
+            # Count non-empty rows over the mapping's slice of the cached rows
+            # (rows[0] is the header), keeping the per-row work in one genexpr
+            start = max(0, mapping.start_row - 2) + 1
+            stop = mapping.end_row if mapping.end_row else None
+            total_count += sum(
+                1
+                for row in rows[start:stop]
+                if q_col_idx < len(row) and row[q_col_idx].strip() not in ("", "-")
+            )
         
         return total_count
 
@@ -876,40 +1454,30 @@ class ExcelParser:
         column_mappings: list[ColumnMapping],
     ) -> int:
         """Count non-empty rows in Excel file."""
-        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
         total_count = 0
 
+        sheet_names = self._sheet_names(file_path)
+        self._preload_sheet_rows(
+            file_path, (m.sheet_name for m in column_mappings if m.sheet_name in sheet_names)
+        )
         for mapping in column_mappings:
-            if mapping.sheet_name not in wb.sheetnames:
+            if mapping.sheet_name not in sheet_names:
                 continue
 
-            ws = wb[mapping.sheet_name]
-
             # Find question column index - use same naming as get_file_metadata
-            header_row = list(ws[1])
-            q_col_idx = None
-            for idx, cell in enumerate(header_row):
-                if cell.value is not None:
-                    col_name = str(cell.value)
-                else:
-                    col_name = f"Column_{idx + 1}"
-                if col_name == mapping.question_column:
-                    q_col_idx = idx
-                    break
+            _, header_index = self._sheet_headers(file_path, mapping.sheet_name)
+            q_col_idx = header_index.get(mapping.question_column)
 
             if q_col_idx is None:
                 continue
 
-            # Count non-empty rows
-            start_row = mapping.start_row
-            end_row = mapping.end_row or ws.max_row
-
-            for row_idx in range(start_row, end_row + 1):
-                row = list(ws[row_idx])
-                if q_col_idx < len(row):
-                    cell = row[q_col_idx]
-                    if cell.value and str(cell.value).strip() and str(cell.value).strip() != "-":
-                        total_count += 1
+            # Count non-empty rows over the mapping's slice of the cached sheet
+            # rows (1-based start_row..end_row), one genexpr per mapping
+            rows = self._sheet_rows(file_path, mapping.sheet_name)
+            total_count += sum(
+                1
+                for row in rows[max(mapping.start_row, 1) - 1:mapping.end_row]
+                if q_col_idx < len(row) and row[q_col_idx] and str(row[q_col_idx]).strip() not in ("", "-")
+            )
 
-        wb.close()
         return total_count
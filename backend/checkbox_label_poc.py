@@ -5,127 +5,210 @@ Target: ESG DDQ sheet, checkboxes in column F (rows 27-102)
 """
 import re
 import os
+import xml.etree.ElementTree as ET
 from html import unescape
+from typing import IO
+from xml.sax.saxutils import escape
 from zipfile import ZipFile, ZIP_DEFLATED
 
+VML_SHAPE_TAG = '{urn:schemas-microsoft-com:vml}shape'
+EXCEL_NS = '{urn:schemas-microsoft-com:office:excel}'
+
+# workbook.xml <sheet> elements and their r:id, and workbook.xml.rels entries
+SHEET_TAG = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}sheet'
+SHEET_RID_ATTR = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+RELATIONSHIP_TAG = '{http://schemas.openxmlformats.org/package/2006/relationships}Relationship'
+
+# VML fallback scan (decoded text, entities are unescaped afterwards)
+VML_SHAPE_RE = re.compile(r'<v:shape[^>]*>.*?</v:shape>', re.DOTALL)
+VML_FONT_RE = re.compile(r'<font[^>]*>(.*?)</font>', re.DOTALL)
+VML_LINK_RE = re.compile(r'<x:FmlaLink>([^<]+)</x:FmlaLink>')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Row number of a linked cell such as $F$30
+LINK_ROW_RE = re.compile(r'\$?[A-Z]+\$?(\d+)')
+
+# Sheet XML is patched as raw UTF-8 bytes, so it is never decoded
+CELL_COLUMN_RE = re.compile(rb'r="([A-Z]+)\d+"')
+
+
+def parse_vml_checkboxes(stream: IO[bytes]) -> list[dict]:
+    """Stream a VML drawing shape by shape and collect checkbox labels and linked cells."""
+    checkboxes = []
+    for _, elem in ET.iterparse(stream, events=('end',)):
+        if elem.tag != VML_SHAPE_TAG:
+            continue
+        
+        client_data = elem.find(f'{EXCEL_NS}ClientData')
+        if client_data is not None and client_data.get('ObjectType') == 'Checkbox':
+            # Label is the text of the <font> tag, linked cell e.g. $F$30
+            font = elem.find('.//font')
+            link = client_data.findtext(f'{EXCEL_NS}FmlaLink')
+            if font is not None and link:
+                checkboxes.append({
+                    'label': ' '.join(''.join(font.itertext()).split()),
+                    'cell': link
+                })
+        # Done with this shape: drop its subtree before parsing the next one
+        elem.clear()
+    return checkboxes
+
+
+def scan_vml_checkboxes(vml_content: str) -> list[dict]:
+    """Regex fallback for VML that is not well-formed XML (e.g. HTML entities)."""
+    checkboxes = []
+    for shape in VML_SHAPE_RE.findall(vml_content):
+        if 'ObjectType="Checkbox"' not in shape:
+            continue
+        
+        # Extract label from <font> tag
+        label_match = VML_FONT_RE.search(shape)
+        # Extract linked cell (e.g., $F$30)
+        link_match = VML_LINK_RE.search(shape)
+        
+        if label_match and link_match:
+            label = WHITESPACE_RE.sub(' ', label_match.group(1)).strip()
+            label = unescape(label)
+            checkboxes.append({
+                'label': label,
+                'cell': link_match.group(1)
+            })
+    return checkboxes
+
 
 def extract_and_write_checkbox_labels(file_path: str) -> None:
     """Extract checkbox labels from VML and write to an empty column, preserving checkboxes."""
     
-    # Step 1: Extract checkbox data from VML
-    checkboxes = []
+    # One handle on the source archive serves every read and the final copy
     with ZipFile(file_path, 'r') as zf:
+        # Step 1: Extract checkbox data from VML
+        checkboxes = []
         vml_files = [f for f in zf.namelist() if 'vmlDrawing' in f]
         
         for vml_file in vml_files:
-            vml_content = zf.read(vml_file).decode('utf-8')
+            try:
+                with zf.open(vml_file) as stream:
+                    checkboxes.extend(parse_vml_checkboxes(stream))
+            except ET.ParseError:
+                checkboxes.extend(scan_vml_checkboxes(zf.read(vml_file).decode('utf-8')))
+        
+        print(f"Found {len(checkboxes)} checkboxes")
+        
+        # Step 2: Find sheet file for "ESG DDQ"
+        # Parsed as XML: attribute order and entities in sheet names don't matter
+        workbook_root = ET.fromstring(zf.read('xl/workbook.xml'))
+        sheet_rids = {sheet.get('name'): sheet.get(SHEET_RID_ATTR) for sheet in workbook_root.iter(SHEET_TAG)}
+        rels_root = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+        rel_targets = {rel.get('Id'): rel.get('Target') for rel in rels_root.iter(RELATIONSHIP_TAG)}
+        
+        rid = sheet_rids.get('ESG DDQ')
+        if not rid:
+            print("ERROR: Could not find ESG DDQ sheet")
+            return
+        
+        target = rel_targets.get(rid)
+        if not target:
+            print("ERROR: Could not find sheet file")
+            return
+        
+        # Targets are relative to xl/, or package-absolute when they start with /
+        sheet_file = target[1:] if target.startswith('/') else 'xl/' + target
+        print(f"Modifying sheet: {sheet_file}")
+        
+        # Step 3: Read sheet XML
+        sheet_xml = zf.read(sheet_file)
+        
+        # Find the highest column letter used in the sheet
+        all_cols = CELL_COLUMN_RE.findall(sheet_xml)
+        if all_cols:
+            max_col = max(all_cols, key=lambda c: (len(c), c)).decode('ascii')
+            # Get next column letter
+            if len(max_col) == 1 and max_col < 'Z':
+                target_col = chr(ord(max_col) + 1)
+            else:
+                # For simplicity, use a column we know is likely empty
+                target_col = 'P'  # Far enough to be safe
+            print(f"Highest column found: {max_col}, will write to: {target_col}")
+        else:
+            target_col = 'G'
+        
+        # Collect the cells to add per row: header in row 26 (where other
+        # headers are), then one label cell per checkbox row
+        new_cells: dict[int, list[bytes]] = {
+            26: [f'<c r="{target_col}26" t="inlineStr"><is><t>Checkbox Alt texts</t></is></c>'.encode('utf-8')]
+        }
+        labels = []
+        for cb in checkboxes:
+            match = LINK_ROW_RE.match(cb['cell'])
+            if not match:
+                continue
+            
+            row_num = int(match.group(1))
+            if not (27 <= row_num <= 102):
+                continue
             
-            # Find all checkbox shapes
-            shape_pattern = r'<v:shape[^>]*>.*?</v:shape>'
-            for shape in re.findall(shape_pattern, vml_content, re.DOTALL):
-                if 'ObjectType="Checkbox"' not in shape:
+            cell_ref = f"{target_col}{row_num}"
+            label = escape(cb['label'], {'"': '&quot;'})
+            
+            new_cells.setdefault(row_num, []).append(
+                f'<c r="{cell_ref}" t="inlineStr"><is><t>{label}</t></is></c>'.encode('utf-8')
+            )
+            labels.append((row_num, cell_ref, cb['label']))
+        
+        # Splice all new cells in with one forward pass: rows are stored in
+        # ascending order, so each target row is located with bytes.find from
+        # the previous splice point and the cells go before its closing tag
+        parts = []
+        pos = 0
+        found_rows = set()
+        for row_num in sorted(new_cells):
+            row_start = sheet_xml.find(b'<row r="%d"' % row_num, pos)
+            if row_start < 0:
+                # Writers that put other attributes before r="..."
+                row_match = re.compile(rb'<row\b[^>]*\br="%d"' % row_num).search(sheet_xml, pos)
+                if not row_match:
                     continue
-                
-                # Extract label from <font> tag
-                label_match = re.search(r'<font[^>]*>(.*?)</font>', shape, re.DOTALL)
-                # Extract linked cell (e.g., $F$30)
-                link_match = re.search(r'<x:FmlaLink>([^<]+)</x:FmlaLink>', shape)
-                
-                if label_match and link_match:
-                    label = re.sub(r'\s+', ' ', label_match.group(1)).strip()
-                    label = unescape(label)
-                    checkboxes.append({
-                        'label': label,
-                        'cell': link_match.group(1)
-                    })
-    
-    print(f"Found {len(checkboxes)} checkboxes")
-    
-    # Step 2: Find sheet file for "ESG DDQ"
-    with ZipFile(file_path, 'r') as zf:
-        workbook_xml = zf.read('xl/workbook.xml').decode('utf-8')
-        rels_xml = zf.read('xl/_rels/workbook.xml.rels').decode('utf-8')
-    
-    sheet_match = re.search(r'<sheet[^>]*name="ESG DDQ"[^>]*r:id="([^"]+)"', workbook_xml)
-    if not sheet_match:
-        print("ERROR: Could not find ESG DDQ sheet")
-        return
-    
-    rid = sheet_match.group(1)
-    rel_match = re.search(rf'<Relationship[^>]*Id="{rid}"[^>]*Target="([^"]+)"', rels_xml)
-    if not rel_match:
-        print("ERROR: Could not find sheet file")
-        return
-    
-    sheet_file = 'xl/' + rel_match.group(1).lstrip('/')
-    print(f"Modifying sheet: {sheet_file}")
-    
-    # Step 3: Read sheet XML
-    with ZipFile(file_path, 'r') as zf:
-        sheet_xml = zf.read(sheet_file).decode('utf-8')
-    
-    # Find the highest column letter used in the sheet
-    all_cols = re.findall(r'r="([A-Z]+)\d+"', sheet_xml)
-    if all_cols:
-        max_col = max(all_cols, key=lambda c: (len(c), c))
-        # Get next column letter
-        if len(max_col) == 1 and max_col < 'Z':
-            target_col = chr(ord(max_col) + 1)
-        else:
-            # For simplicity, use a column we know is likely empty
-            target_col = 'P'  # Far enough to be safe
-        print(f"Highest column found: {max_col}, will write to: {target_col}")
-    else:
-        target_col = 'G'
-    
-    modified_xml = sheet_xml
-    
-    # Add header for the new column in row 26 (where other headers are)
-    header_cell = f'<c r="{target_col}26" t="inlineStr"><is><t>Checkbox Alt texts</t></is></c>'
-    row26_pattern = r'(<row[^>]*r="26"[^>]*>)(.*?)(</row>)'
-    row26_match = re.search(row26_pattern, modified_xml, re.DOTALL)
-    if row26_match:
-        new_row26 = row26_match.group(1) + row26_match.group(2) + header_cell + row26_match.group(3)
-        modified_xml = modified_xml[:row26_match.start()] + new_row26 + modified_xml[row26_match.end():]
-        print(f"Added header 'Checkbox Alt texts' in {target_col}26")
-    
-    # Write labels to the target column
-    written = 0
-    for cb in checkboxes:
-        match = re.match(r'\$?[A-Z]+\$?(\d+)', cb['cell'])
-        if not match:
-            continue
+                row_start = row_match.start()
+            tag_end = sheet_xml.find(b'>', row_start)
+            if sheet_xml[tag_end - 1:tag_end] == b'/':
+                continue  # <row .../> has no closing tag to insert before
+            row_end = sheet_xml.find(b'</row>', tag_end)
+            if row_end < 0:
+                continue
+            parts.append(sheet_xml[pos:row_end])
+            parts.extend(new_cells[row_num])
+            pos = row_end
+            found_rows.add(row_num)
+        parts.append(sheet_xml[pos:])
+        modified_xml = b''.join(parts)
         
-        row_num = int(match.group(1))
-        if not (27 <= row_num <= 102):
-            continue
+        if 26 in found_rows:
+            print(f"Added header 'Checkbox Alt texts' in {target_col}26")
         
-        cell_ref = f"{target_col}{row_num}"
-        label = cb['label'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+        # Write labels to the target column
+        written = 0
+        for row_num, cell_ref, label in labels:
+            if row_num in found_rows:
+                print(f"  Row {row_num} -> {cell_ref}: {label[:50]}...")
+                written += 1
+            else:
+                print(f"  WARNING: Row {row_num} not found")
         
-        new_cell = f'<c r="{cell_ref}" t="inlineStr"><is><t>{label}</t></is></c>'
+        # Step 4: Write back to ZIP (only when the sheet actually changed)
+        if not found_rows:
+            print("\nNo labels written, workbook left untouched")
+            return
+        
+        temp_path = file_path + '.tmp'
         
-        # Insert cell into the row
-        row_pattern = rf'(<row[^>]*r="{row_num}"[^>]*>)(.*?)(</row>)'
-        row_match = re.search(row_pattern, modified_xml, re.DOTALL)
-        if row_match:
-            new_row = row_match.group(1) + row_match.group(2) + new_cell + row_match.group(3)
-            modified_xml = modified_xml[:row_match.start()] + new_row + modified_xml[row_match.end():]
-            print(f"  Row {row_num} -> {cell_ref}: {cb['label'][:50]}...")
-            written += 1
-        else:
-            print(f"  WARNING: Row {row_num} not found")
-    
-    # Step 4: Write back to ZIP
-    temp_path = file_path + '.tmp'
-    
-    with ZipFile(file_path, 'r') as zf_in:
         with ZipFile(temp_path, 'w', ZIP_DEFLATED) as zf_out:
-            for item in zf_in.namelist():
-                if item == sheet_file:
-                    zf_out.writestr(item, modified_xml.encode('utf-8'))
+            # Reuse each entry's ZipInfo so it keeps its compression method and
+            # timestamp: stored parts (e.g. images) are copied without deflating
+            for info in zf.infolist():
+                if info.filename == sheet_file:
+                    zf_out.writestr(info, modified_xml)
                 else:
-                    zf_out.writestr(item, zf_in.read(item))
+                    zf_out.writestr(info, zf.read(info))
     
     os.replace(temp_path, file_path)
     
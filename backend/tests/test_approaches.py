@@ -11,49 +11,50 @@ from app.schemas import ColumnMapping, QuestionType
 TEST_FILES_DIR = Path(__file__).parent.parent.parent / "docs"
 
 
-class TestExcelParser:
-    """Tests for ExcelParser."""
+@pytest.fixture(scope="module")
+def parser():
+    """One ExcelParser shared by the module; its caches are keyed per file version."""
+    with ExcelParser() as parser:
+        yield parser
 
-    def test_get_file_metadata(self):
-        """Test metadata extraction from Excel file."""
-        parser = ExcelParser()
-        test_file = TEST_FILES_DIR / "sample_survey.xlsx"
 
-        if not test_file.exists():
-            pytest.skip("Test file not found")
+@pytest.fixture(scope="module")
+def sample_file():
+    """Path to the sample survey workbook, skipping once if it is missing."""
+    test_file = TEST_FILES_DIR / "sample_survey.xlsx"
+    if not test_file.exists():
+        pytest.skip("Test file not found")
+    return str(test_file)
+
+
+@pytest.fixture(scope="module")
+def metadata(parser, sample_file):
+    """Metadata of the sample survey workbook, read once."""
+    return parser.get_file_metadata(sample_file)
 
-        metadata = parser.get_file_metadata(str(test_file))
 
+class TestExcelParser:
+    """Tests for ExcelParser."""
+
+    def test_get_file_metadata(self, metadata):
+        """Test metadata extraction from Excel file."""
         assert len(metadata) > 0
         assert metadata[0].name is not None
         assert len(metadata[0].columns) > 0
         assert metadata[0].row_count >= 0
 
-    def test_convert_to_markdown(self):
-        """Test MarkItDown conversion."""
-        parser = ExcelParser()
-        test_file = TEST_FILES_DIR / "sample_survey.xlsx"
-
-        if not test_file.exists():
-            pytest.skip("Test file not found")
-
-        markdown = parser.convert_to_markdown(str(test_file))
+    def test_convert_to_markdown(self, parser, sample_file):
+        """Test Excel to markdown conversion."""
+        markdown = parser.convert_to_markdown(sample_file)
 
         assert markdown is not None
         assert len(markdown) > 0
         # Should not contain NaN after cleanup
         assert "NaN" not in markdown or markdown.count("NaN") < 5
 
-    def test_extract_rows_by_columns(self):
+    def test_extract_rows_by_columns(self, parser, sample_file, metadata):
         """Test deterministic row extraction."""
-        parser = ExcelParser()
-        test_file = TEST_FILES_DIR / "sample_survey.xlsx"
-
-        if not test_file.exists():
-            pytest.skip("Test file not found")
-
-        # Get metadata first to find column names
-        metadata = parser.get_file_metadata(str(test_file))
+        # Use metadata to find column names
         if not metadata or not metadata[0].columns:
             pytest.skip("No columns found in test file")
 
@@ -64,20 +65,13 @@ class TestExcelParser:
             question_types=[QuestionType.OPEN_ENDED],
         )
 
-        questions = parser.extract_rows_by_columns(str(test_file), [mapping])
+        questions = parser.extract_rows_by_columns(sample_file, [mapping])
 
         # Should extract something (depending on file content)
         assert isinstance(questions, list)
 
-    def test_count_rows_in_columns(self):
+    def test_count_rows_in_columns(self, parser, sample_file, metadata):
         """Test row counting."""
-        parser = ExcelParser()
-        test_file = TEST_FILES_DIR / "sample_survey.xlsx"
-
-        if not test_file.exists():
-            pytest.skip("Test file not found")
-
-        metadata = parser.get_file_metadata(str(test_file))
         if not metadata:
             pytest.skip("No metadata found")
 
@@ -86,10 +80,188 @@ class TestExcelParser:
             question_column=metadata[0].columns[0],
         )
 
-        count = parser.count_rows_in_columns(str(test_file), [mapping])
+        count = parser.count_rows_in_columns(sample_file, [mapping])
 
         assert count >= 0
 
+    def test_excel_readers_agree_on_docs_workbook(self, parser, tmp_path, monkeypatch):
+        """calamine and openpyxl read the same rows from every sheet of a docs workbook."""
+        import shutil
+
+        from app.services import excel_parser
+
+        if not excel_parser.CALAMINE_AVAILABLE:
+            pytest.skip("python-calamine not installed")
+        source = TEST_FILES_DIR / "Ecovadis_reassessment_questionnaire_2024_empty.xlsx"
+        if not source.exists():
+            pytest.skip("Test file not found")
+
+        rows_by_reader = []
+        for use_calamine in (True, False):
+            monkeypatch.setattr(excel_parser, "CALAMINE_AVAILABLE", use_calamine)
+            # One copy per reader: read rows are cached by file path
+            xlsx_file = str(tmp_path / f"calamine_{use_calamine}.xlsx")
+            shutil.copyfile(source, xlsx_file)
+            rows_by_reader.append({
+                sheet_name: list(parser._iter_sheet_rows(xlsx_file, sheet_name))
+                for sheet_name in parser._sheet_names(xlsx_file)
+            })
+
+        assert rows_by_reader[0] == rows_by_reader[1]
+
+    def test_excel_readers_agree_on_dates_and_numbers(self, parser, tmp_path, monkeypatch):
+        """Dates read as datetimes and only exactly representable floats as ints."""
+        from datetime import date, datetime
+
+        from openpyxl import Workbook
+
+        from app.services import excel_parser
+
+        if not excel_parser.CALAMINE_AVAILABLE:
+            pytest.skip("python-calamine not installed")
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Values"
+        sheet.append(["Q", "Due", "Large", "Whole", "Blank"])
+        sheet.append(["Q1", date(2024, 1, 2), 1e20, 3.0, ""])
+
+        rows_by_reader = []
+        for use_calamine in (True, False):
+            monkeypatch.setattr(excel_parser, "CALAMINE_AVAILABLE", use_calamine)
+            # One copy per reader: read rows are cached by file path
+            xlsx_file = str(tmp_path / f"calamine_{use_calamine}.xlsx")
+            workbook.save(xlsx_file)
+            rows_by_reader.append(list(parser._iter_sheet_rows(xlsx_file, "Values", min_row=2)))
+
+        for rows in rows_by_reader:
+            assert rows == [("Q1", datetime(2024, 1, 2), 1e20, 3, None)]
+            assert isinstance(rows[0][2], float)
+
+    def test_csv_blank_header_names_match_metadata(self, parser, tmp_path):
+        """Columns named in metadata ("Unnamed: N") resolve in extract/count."""
+        csv_file = tmp_path / "survey.csv"
+        csv_file.write_text("Id,\n1,What is your name?\n2,How old are you?\n3,\n")
+
+        metadata = parser.get_file_metadata(str(csv_file))
+        assert metadata[0].columns == ["Id", "Unnamed: 1"]
+
+        mapping = ColumnMapping(sheet_name="survey", question_column="Unnamed: 1")
+
+        assert parser.count_rows_in_columns(str(csv_file), [mapping]) == 2
+        questions = parser.extract_rows_by_columns(str(csv_file), [mapping])
+        assert [q.question_text for q in questions] == ["What is your name?", "How old are you?"]
+
+    def test_excel_duplicate_header_resolves_to_last_column(self, parser, tmp_path):
+        """A duplicated header name maps to its last occurrence in extract and count."""
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Dup"
+        sheet.append(["Q", "Q"])
+        sheet.append(["Old wording?", "New wording?"])
+        sheet.append(["Dropped?", None])
+        xlsx_file = tmp_path / "dup.xlsx"
+        workbook.save(xlsx_file)
+
+        mapping = ColumnMapping(sheet_name="Dup", question_column="Q")
+
+        questions = parser.extract_rows_by_columns(str(xlsx_file), [mapping])
+        assert [q.question_text for q in questions] == ["New wording?"]
+        assert parser.count_rows_in_columns(str(xlsx_file), [mapping]) == 1
+
+    def test_excel_start_row_zero_starts_at_first_row(self, parser, tmp_path):
+        """A start_row below 1 starts at row 1 and keeps row indices 1-based."""
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Rows"
+        sheet.append(["Q"])
+        sheet.append(["a?"])
+        sheet.append(["b?"])
+        xlsx_file = tmp_path / "rows.xlsx"
+        workbook.save(xlsx_file)
+
+        mapping = ColumnMapping(sheet_name="Rows", question_column="Q", start_row=0, end_row=2)
+
+        questions = parser.extract_rows_by_columns(str(xlsx_file), [mapping])
+        assert [(q.question_text, q.row_index) for q in questions] == [("Q", 1), ("a?", 2)]
+        assert parser.count_rows_in_columns(str(xlsx_file), [mapping]) == 2
+
+    def test_csv_type_column_normalization(self, parser, tmp_path):
+        """Type values tolerate case, padding and space/hyphen separators."""
+        csv_file = tmp_path / "typed.csv"
+        csv_file.write_text("Question,Type\nQ1, Single Choice \nQ2,yes-no\nQ3,MULTIPLE\nQ4,unknown\n")
+
+        mapping = ColumnMapping(sheet_name="typed", question_column="Question", type_column="Type")
+        questions = parser.extract_rows_by_columns(str(csv_file), [mapping])
+
+        assert [q.question_type for q in questions] == [
+            QuestionType.SINGLE_CHOICE,
+            QuestionType.YES_NO,
+            QuestionType.MULTIPLE_CHOICE,
+            QuestionType.OPEN_ENDED,
+        ]
+
+    def test_excel_metadata_counts_rows_after_large_gap(self, parser, tmp_path):
+        """Metadata counts the same rows that extraction reads past a gap."""
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Gap"
+        sheet["A1"] = "Q"
+        sheet["A2"] = "First question?"
+        sheet["A1500"] = "Late question?"
+        xlsx_file = tmp_path / "gap.xlsx"
+        workbook.save(xlsx_file)
+
+        mapping = ColumnMapping(sheet_name="Gap", question_column="Q")
+
+        metadata = parser.get_file_metadata(str(xlsx_file))
+        assert metadata[0].row_count == 2
+        assert parser.count_rows_in_columns(str(xlsx_file), [mapping]) == 2
+
+    def test_excel_rows_after_large_gap(self, parser, tmp_path, monkeypatch):
+        """Rows after a long run of empty rows are read on the openpyxl path."""
+        from openpyxl import Workbook
+
+        from app.services import excel_parser
+
+        monkeypatch.setattr(excel_parser, "CALAMINE_AVAILABLE", False)
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.title = "Gap"
+        sheet["A1"] = "Q"
+        sheet["A2"] = "First question?"
+        sheet["A1500"] = "Late question?"
+        xlsx_file = tmp_path / "gap.xlsx"
+        workbook.save(xlsx_file)
+
+        mapping = ColumnMapping(sheet_name="Gap", question_column="Q")
+
+        questions = parser.extract_rows_by_columns(str(xlsx_file), [mapping])
+        assert [q.question_text for q in questions] == ["First question?", "Late question?"]
+        assert parser.count_rows_in_columns(str(xlsx_file), [mapping]) == 2
+        assert "Late question?" in parser.convert_to_markdown(str(xlsx_file))
+
+    def test_csv_header_delimiter_ties_use_sniffer(self, parser, tmp_path):
+        """A tab header holding one comma is not read as comma-separated."""
+        csv_file = tmp_path / "tabbed.csv"
+        csv_file.write_text("Question, with comma\tAnswer\nQ1\tYes\nQ2\tNo\n")
+
+        metadata = parser.get_file_metadata(str(csv_file))
+        assert metadata[0].columns == ["Question, with comma", "Answer"]
+
+    def test_csv_header_delimiter_must_repeat_on_second_line(self, parser, tmp_path):
+        """Semicolons in a comma-separated header do not decide the delimiter."""
+        csv_file = tmp_path / "commas.csv"
+        csv_file.write_text("Q; a; b,Answer\nQ1,Yes\nQ2,No\n")
+
+        metadata = parser.get_file_metadata(str(csv_file))
+        assert metadata[0].columns == ["Q; a; b", "Answer"]
+
 
 class TestColumnMapping:
     """Tests for ColumnMapping model."""
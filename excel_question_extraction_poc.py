@@ -24,25 +24,32 @@ Note: Uses Claude Sonnet 4 via AWS Bedrock inference profile for best accuracy a
 """
 
 import os
+import re
 import sys
 import json
+import threading
 import asyncio
 import argparse
+import copy
+import hashlib
+import importlib.metadata
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from io import BytesIO
+from typing import List, Dict, Any, Optional, Tuple
+from io import BytesIO, StringIO
+import xml.etree.ElementTree as ET
 from datetime import datetime
 
-# Excel processing
-
-# Microsoft MarkItDown
-from markitdown import MarkItDown
-
-# AWS Bedrock
-import boto3
-from botocore.exceptions import ClientError, BotoCoreError
+# Microsoft MarkItDown and the AWS SDK take seconds to import: load_runtime() imports
+# them when an extractor is created, so --help and argument errors return immediately
+MarkItDown = None
+boto3 = None
+ClientError = None
 
 # Setup logging
 logging.basicConfig(
@@ -51,6 +58,107 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Check if orjson is available (C JSON encoder/decoder, much faster on large responses)
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    logger.info("orjson not installed. JSON uses the json module.")
+
+# Threads for blocking Bedrock calls, so the event loop stays free meanwhile
+BEDROCK_MAX_WORKERS = 8
+
+# Client-side pacing of Bedrock requests, sized to the account's quota
+BEDROCK_MAX_CONCURRENCY = int(os.getenv('BEDROCK_MAX_CONCURRENCY', '8'))
+BEDROCK_RPM = float(os.getenv('BEDROCK_RPM', '60'))
+
+# Excel files picked up by --batch, and how many are processed at once
+BATCH_FILE_PATTERNS = ("*.xlsx", "*.xlsm", "*.xls")
+BATCH_CONCURRENCY = 8
+
+# Markdown above this size is split by sheet / row groups into separate requests,
+# keeping each response well under the output token cap
+CHUNK_THRESHOLD_CHARS = 40000
+CHUNK_MAX_CONCURRENCY = 4
+SHEET_HEADING_RE = re.compile(r'(?m)^(?=## )')
+
+# Patterns for cleaning and recovering malformed JSON responses, compiled once
+JSON_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]')
+# Same characters as a str.translate deletion table: much faster on ASCII-only text,
+# but slower than the regex once the string holds any non-ASCII character
+JSON_CONTROL_CHARS_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), *range(0x7F, 0xA0)])
+TOTAL_QUESTIONS_RE = re.compile(r'"total_questions_found":\s*(\d+)')
+QUESTIONS_ARRAY_RE = re.compile(r'"questions":\s*\[(.*?)\]', re.DOTALL)
+QUESTION_OBJECT_RE = re.compile(r'\{[^{}]*"question_text"[^{}]*\}')
+QUESTION_TEXT_RE = re.compile(r'"question_text":\s*"([^"]*)"')
+QUESTION_LIKE_RES = [
+    re.compile(r'["\']([^"\']*\?[^"\']*)["\']'),  # Text ending with ?
+    re.compile(r'["\']([^"\']*(?:what|how|when|where|why|which|who)[^"\']*)["\']', re.IGNORECASE),  # Question words
+    re.compile(r'["\']([^"\']*(?:please|rate|describe|provide)[^"\']*)["\']', re.IGNORECASE),  # Instruction words
+]
+
+# Accepts raw control characters (e.g. literal newlines) inside JSON strings
+LENIENT_JSON_DECODER = json.JSONDecoder(strict=False)
+
+# Raw Bedrock responses kept in the results beyond this are truncated (see --keep-raw)
+RAW_RESPONSE_MAX_CHARS = 4096
+
+# On-disk cache of Bedrock responses, keyed by model and request payload
+LLM_CACHE_DIR = Path("data/llm_cache")
+LLM_CACHE_TTL_DAYS = float(os.getenv('LLM_CACHE_TTL_DAYS', '7'))
+
+# Cleaned MarkItDown output by workbook content and MarkItDown version (AQE_NO_CACHE=1 disables)
+MARKITDOWN_CACHE_DIR = Path.home() / ".cache" / "aqe-poc"
+
+
+# bedrock-runtime clients by (region, read_timeout, max_attempts): building one loads the
+# endpoint/service models and starts a new connection pool, so extractors share them
+_BEDROCK_CLIENTS: Dict[Tuple[str, int, int], Any] = {}
+
+
+def get_bedrock_client(region: str, read_timeout: int = 600, max_attempts: int = 3):
+    """Shared bedrock-runtime client (boto3 clients are thread-safe)"""
+    key = (region, read_timeout, max_attempts)
+    client = _BEDROCK_CLIENTS.get(key)
+    if client is None:
+        load_runtime()
+        from botocore.config import Config
+        
+        config = Config(
+            read_timeout=read_timeout,
+            connect_timeout=60,
+            retries={'max_attempts': max_attempts, 'mode': 'adaptive'},
+            # Enough keep-alive connections for every worker thread and in-flight request
+            max_pool_connections=max(BEDROCK_MAX_WORKERS, BEDROCK_MAX_CONCURRENCY)
+        )
+        client = _BEDROCK_CLIENTS[key] = boto3.Session(region_name=region).client('bedrock-runtime', config=config)
+    return client
+
+
+def load_runtime():
+    """Import MarkItDown and boto3/botocore into the module globals (once)"""
+    global MarkItDown, boto3, ClientError
+    if boto3 is not None:
+        return
+    
+    # Microsoft MarkItDown
+    from markitdown import MarkItDown
+    
+    # AWS Bedrock
+    import boto3
+    from botocore.exceptions import ClientError
+
+
+def loads_json(data):
+    """Decode JSON with orjson when available; json.loads also accepts what orjson rejects (e.g. NaN)"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
 
 class PerformanceTracker:
     """Track performance metrics for different operations"""
@@ -61,16 +169,26 @@ class PerformanceTracker:
     
     def start_timer(self, operation: str):
         """Start timing an operation"""
-        self.start_times[operation] = time.time()
+        # Monotonic integer clock: immune to wall-clock (NTP) adjustments
+        self.start_times[operation] = time.perf_counter_ns()
     
     def end_timer(self, operation: str) -> float:
-        """End timing an operation and return duration"""
-        if operation in self.start_times:
-            duration = time.time() - self.start_times[operation]
-            self.timings[operation] = duration
-            del self.start_times[operation]
-            return duration
-        return 0.0
+        """End timing an operation and return duration in seconds"""
+        start = self.start_times.pop(operation, None)
+        if start is None:
+            return 0.0
+        duration = (time.perf_counter_ns() - start) / 1e9
+        self.timings[operation] = duration
+        return duration
+    
+    @contextmanager
+    def timer(self, operation: str):
+        """Time the enclosed block; the duration in seconds is recorded even if it raises"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.timings[operation] = (time.perf_counter_ns() - start) / 1e9
     
     def get_timing(self, operation: str) -> float:
         """Get timing for an operation"""
@@ -95,9 +213,44 @@ class PerformanceTracker:
 class ExcelTextExtractor:
     """Convert Excel files to text using different strategies"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[Path] = None):
         self.logger = logging.getLogger(__name__)
+        load_runtime()
+        # One MarkItDown per worker thread, reused for every file that thread converts
+        self._local = threading.local()
+        # Where conversions are memoized; None converts every time
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+    
+    @property
+    def _md(self) -> "MarkItDown":
+        md = getattr(self._local, 'md', None)
+        if md is None:
+            md = self._local.md = MarkItDown()
+        return md
+    
+    def _cache_path(self, file_path: str) -> Path:
+        """Cache file for the workbook's bytes as converted by the installed MarkItDown version"""
+        try:
+            markitdown_version = importlib.metadata.version('markitdown')
+        except importlib.metadata.PackageNotFoundError:
+            markitdown_version = 'unknown'
+        
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest.update(markitdown_version.encode('utf-8'))
+        return self.cache_dir / f"{digest.hexdigest()}.md"
     
+    def _write_cache(self, cache_path: Path, markdown_text: str) -> None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent readers never see a partial entry
+            temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_text(markdown_text, encoding='utf-8')
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to cache MarkItDown text at {cache_path}: {e}")
     
     def extract_markitdown_text(self, file_path: str, perf_tracker: PerformanceTracker = None) -> str:
         """Use Microsoft MarkItDown for Excel text extraction"""
@@ -105,23 +258,30 @@ class ExcelTextExtractor:
             perf_tracker.start_timer("markitdown_extraction")
         
         try:
-            # Initialize MarkItDown
-            md = MarkItDown()
+            # Same workbook bytes and MarkItDown version: reuse the earlier conversion
+            cache_path = self._cache_path(file_path) if self.cache_dir is not None else None
+            if cache_path is not None and cache_path.exists():
+                markdown_text = cache_path.read_text(encoding='utf-8')
+                self.logger.info(f"Using cached MarkItDown text: {len(markdown_text)} characters")
+                if perf_tracker:
+                    perf_tracker.end_timer("markitdown_extraction")
+                return markdown_text
             
             # Convert Excel file to markdown
-            result = md.convert(file_path)
+            result = self._md.convert(file_path)
             
             if result and hasattr(result, 'text_content'):
                 markdown_text = result.text_content
                 
-                # Clean up NaN values - replace with dash for better readability
-                markdown_text = markdown_text.replace(' NaN ', ' - ')
-                markdown_text = markdown_text.replace('| NaN |', '| - |')
-                markdown_text = markdown_text.replace('\nNaN\n', '\n-\n')
-                markdown_text = markdown_text.replace('NaN', '-')  # Catch any remaining NaN
+                # Clean up NaN values - replace with dash for better readability.
+                # Cells (' NaN ', '| NaN |', '\nNaN\n') keep their delimiters, so one pass covers them all
+                markdown_text = markdown_text.replace('NaN', '-')
                 
                 self.logger.info(f"MarkItDown extracted {len(markdown_text)} characters (NaN values cleaned)")
                 
+                if cache_path is not None and markdown_text:
+                    self._write_cache(cache_path, markdown_text)
+                
                 if perf_tracker:
                     duration = perf_tracker.end_timer("markitdown_extraction")
                     self.logger.info(f"MarkItDown extraction took: {perf_tracker.format_duration(duration)}")
@@ -162,8 +322,12 @@ RULES:
 - Return ONLY the XML, nothing else'''
     
     @staticmethod
-    def get_complete_prompt(extraction_method: str, content: str) -> str:
-        """Ultra-compact prompt for maximum token efficiency"""
+    @lru_cache(maxsize=1)
+    def get_static_prefix() -> str:
+        """Rules and output format shared by every request, built once.
+
+        Kept ahead of the survey content so it can be sent as a cached prompt prefix.
+        """
         return f"""Extract ALL questions from this survey content.
 
 EXTRACTION RULES
@@ -202,19 +366,128 @@ yes_no: The question can only be answered with Yes or No.
 
 Important: If a question includes both answer options and subquestions, always classify it as grouped_question. Subquestions take priority over answer format when determining the category.
 
-CONTENT:
-{content}
-
 OUTPUT FORMAT:
-{PromptTemplates.get_xml_template()}
+{PromptTemplates.get_xml_template()}"""
+    
+    @staticmethod
+    def get_content_suffix(content: str) -> str:
+        """Per-request part of the prompt: the survey content"""
+        return f"""CONTENT:
+{content}
 
 Extract ALL questions. Return ONLY the XML."""
+    
+    @staticmethod
+    def get_complete_prompt(extraction_method: str, content: str) -> str:
+        """Ultra-compact prompt for maximum token efficiency"""
+        return f"{PromptTemplates.get_static_prefix()}\n\n{PromptTemplates.get_content_suffix(content)}"
+    
+    @staticmethod
+    def get_prompt_blocks(content: str) -> List[Dict[str, Any]]:
+        """Prompt as Claude content blocks, with the static prefix marked for prompt caching"""
+        return [
+            {
+                "type": "text",
+                "text": PromptTemplates.get_static_prefix(),
+                "cache_control": {"type": "ephemeral"}
+            },
+            {
+                "type": "text",
+                "text": PromptTemplates.get_content_suffix(content)
+            }
+        ]
+
+
+class BedrockRateLimiter:
+    """Caps in-flight Bedrock requests and paces starts with a token bucket refilled at rpm/60 per second.
+    
+    Use as `async with limiter:` around each request.
+    """
+    
+    def __init__(self, max_concurrent: int = BEDROCK_MAX_CONCURRENCY, rpm: float = BEDROCK_RPM):
+        self.rate = rpm / 60.0
+        # Allow a burst of up to max_concurrent requests, then steady pacing
+        self.capacity = float(max(1, max_concurrent))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._lock = asyncio.Lock()
+    
+    async def _take_token(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+
+class LLMCache:
+    """Response texts stored as data/llm_cache/{key[:2]}/{key}.json, expiring after a TTL"""
+    
+    def __init__(self, cache_dir: Path = LLM_CACHE_DIR, ttl_days: float = LLM_CACHE_TTL_DAYS):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_days * 24 * 3600
+        self.logger = logging.getLogger(__name__)
+    
+    @staticmethod
+    def make_key(model_id: str, payload: Dict[str, Any]) -> str:
+        """SHA-256 of the model id and the canonical JSON payload"""
+        return hashlib.sha256((model_id + json.dumps(payload, sort_keys=True)).encode('utf-8')).hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        # Shard by the first two hex digits to keep directories small
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[str]:
+        """Cached response text, or None when missing, expired or unreadable"""
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['response_text']
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                self.logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+    
+    def set(self, key: str, text: str) -> None:
+        """Store a response text; failures are logged, never raised"""
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent readers never see a partial entry
+            temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"response_text": text}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Failed to write cache entry {path}: {e}")
 
 
 class BedrockQuestionExtractor:
     """Use AWS Bedrock for question extraction"""
     
-    def __init__(self, region: str = "us-west-2", model_id: str = None):
+    def __init__(self, region: str = "us-west-2", model_id: str = None, cache: Optional[LLMCache] = None,
+                 keep_raw: bool = False):
         if model_id is None:
             model_id = os.getenv('BEDROCK_MODEL_ID', 'arn:aws:bedrock:us-west-2:492490406854:inference-profile/global.anthropic.claude-opus-4-5-20250514-v1:0')
         self.region = region
@@ -222,20 +495,19 @@ class BedrockQuestionExtractor:
         self.logger = logging.getLogger(__name__)
         self.prompt_templates = PromptTemplates()
         self.perf_tracker = PerformanceTracker()
+        self.cache = cache
+        self.keep_raw = keep_raw
+        # Pending Bedrock calls by request key, so identical concurrent requests share one call
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Shared by every request of this extractor (chunks and batch files alike)
+        self.rate_limiter = BedrockRateLimiter()
         
         # AWS session and client initialization
         try:
-            from botocore.config import Config
-            
-            # Configure with increased timeout for large files
-            config = Config(
-                read_timeout=600,  # 10 minutes for large file processing
-                connect_timeout=60,
-                retries={'max_attempts': 3, 'mode': 'adaptive'}
-            )
-            
-            self.session = boto3.Session(region_name=region)
-            self.bedrock_runtime = self.session.client('bedrock-runtime', config=config)
+            # Increased timeout for large files: 10 minutes
+            self.bedrock_runtime = get_bedrock_client(region, read_timeout=600, max_attempts=3)
+            # Dedicated pool: long Bedrock calls don't occupy the loop's default executor
+            self._executor = ThreadPoolExecutor(max_workers=BEDROCK_MAX_WORKERS)
             self.logger.info(f"Bedrock client initialized for region: {region} with 10-minute timeout")
         except Exception as e:
             self.logger.error(f"Failed to initialize Bedrock client: {e}")
@@ -244,8 +516,15 @@ class BedrockQuestionExtractor:
     async def extract_questions_from_text(self, text_content: str) -> Dict[str, Any]:
         """Extract questions from text using Bedrock with chunking for large content"""
         
-        # Use the new organized prompt template
-        prompt = self.prompt_templates.get_complete_prompt("text_based", text_content)
+        if len(text_content) > CHUNK_THRESHOLD_CHARS:
+            return await self._extract_questions_chunked(text_content)
+        return await self._extract_questions_single(text_content)
+    
+    async def _extract_questions_single(self, text_content: str) -> Dict[str, Any]:
+        """Extract questions from text with a single Bedrock request"""
+        
+        # Use the new organized prompt template (cacheable rules prefix + content)
+        prompt = self.prompt_templates.get_prompt_blocks(text_content)
 
         try:
             response = await self._invoke_bedrock_model(prompt)
@@ -261,10 +540,91 @@ class BedrockQuestionExtractor:
                 "questions": []
             }
 
-    async def _invoke_bedrock_model(self, prompt: str) -> str:
-        """Invoke Bedrock model (Claude Sonnet 4)"""
+    async def _extract_questions_chunked(self, text_content: str) -> Dict[str, Any]:
+        """Extract from each chunk concurrently and merge the questions in document order"""
+        chunks = self._split_markdown(text_content, CHUNK_THRESHOLD_CHARS)
+        self.logger.info(f"Content is {len(text_content)} characters: extracting from {len(chunks)} chunks")
+        
+        sem = asyncio.Semaphore(CHUNK_MAX_CONCURRENCY)
+        
+        async def extract_chunk(chunk: str) -> Dict[str, Any]:
+            async with sem:
+                return await self._extract_questions_single(chunk)
+        
+        chunk_results = await asyncio.gather(*[extract_chunk(chunk) for chunk in chunks])
+        
+        # Sheets / row groups can repeat content at their edges: keep the first occurrence
+        questions = []
+        seen = set()
+        errors = []
+        for index, result in enumerate(chunk_results, 1):
+            if not result.get("success"):
+                errors.append(f"Chunk {index}: {result.get('error', 'Unknown error')}")
+            for question in result.get("questions", []):
+                key = (question.get("question_text"), question.get("question_type"))
+                if key not in seen:
+                    seen.add(key)
+                    questions.append(question)
         
-        self.perf_tracker.start_timer("bedrock_api_call")
+        merged = {
+            "extraction_method": "text_based",
+            "success": len(errors) < len(chunk_results),
+            "total_questions_found": len(questions),
+            "questions": questions,
+            "chunks": len(chunks),
+            "raw_response": "\n".join(result.get("raw_response", "") for result in chunk_results)
+        }
+        if errors:
+            merged["error"] = "; ".join(errors)
+        return merged
+    
+    @staticmethod
+    def _split_markdown(text_content: str, max_chars: int) -> List[str]:
+        """Split MarkItDown output into chunks of about max_chars.
+        
+        Whole sheets (## headings) are packed together; a sheet that is too large
+        is split between table rows, repeating its heading and table header.
+        """
+        chunks = []
+        current = ""
+        
+        for section in SHEET_HEADING_RE.split(text_content):
+            if not section.strip():
+                continue
+            
+            if len(section) <= max_chars:
+                pieces = [section]
+            else:
+                lines = section.splitlines(keepends=True)
+                # Heading plus the table header row and its |---| separator
+                header_end = 0
+                for i, line in enumerate(lines[:4]):
+                    if line.startswith('|') and set(line.strip()) <= set('|-: '):
+                        header_end = i + 1
+                        break
+                header = "".join(lines[:header_end])
+                
+                pieces = []
+                piece = header
+                for line in lines[header_end:]:
+                    if len(piece) + len(line) > max_chars and len(piece) > len(header):
+                        pieces.append(piece)
+                        piece = header
+                    piece += line
+                pieces.append(piece)
+            
+            for piece in pieces:
+                if current and len(current) + len(piece) > max_chars:
+                    chunks.append(current)
+                    current = ""
+                current += piece
+        
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    async def _invoke_bedrock_model(self, prompt: List[Dict[str, Any]]) -> str:
+        """Invoke Bedrock model (Claude Sonnet 4) with a list of content blocks"""
         
         # Claude API payload
         payload = {
@@ -279,20 +639,64 @@ class BedrockQuestionExtractor:
             ]
         }
         
+        # Identical model + payload: reuse the stored response instead of calling Bedrock
+        request_key = LLMCache.make_key(self.model_id, payload)
+        if self.cache is not None:
+            cached_text = self.cache.get(request_key)
+            if cached_text is not None:
+                self.logger.info(f"Using cached Bedrock response ({len(cached_text)} characters)")
+                return cached_text
+        
+        # Identical request already in flight (e.g. template workbooks in a batch): share its response
+        pending = self._inflight.get(request_key)
+        if pending is not None:
+            self.logger.info("Identical Bedrock request in flight - awaiting its response")
+            return await asyncio.shield(pending)
+        
+        # No await between the lookup above and registering here, so no lock is needed
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[request_key] = future
+        try:
+            response_text = await self._request_bedrock(payload)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved: no warning when nobody else was waiting
+            raise
+        else:
+            future.set_result(response_text)
+            if self.cache is not None:
+                self.cache.set(request_key, response_text)
+            return response_text
+        finally:
+            del self._inflight[request_key]
+    
+    async def _request_bedrock(self, payload: Dict[str, Any]) -> str:
+        """Send one InvokeModel request and return the response text"""
+        prompt = payload["messages"][0]["content"]
         try:
+            prompt_length = sum(len(block["text"]) for block in prompt)
             self.logger.info(f"Invoking Bedrock model: {self.model_id}")
-            self.logger.info(f"Prompt length: {len(prompt)} characters (~{len(prompt)//4} tokens)")
+            self.logger.info(f"Prompt length: {prompt_length} characters (~{prompt_length//4} tokens)")
             
-            response = self.bedrock_runtime.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(payload),
-                contentType='application/json'
-            )
+            # invoke_model and reading its HTTPS body both block: run them off the loop
+            loop = asyncio.get_running_loop()
+            body = orjson.dumps(payload) if ORJSON_AVAILABLE else json.dumps(payload)
+            async with self.rate_limiter:
+                # Start time lives in the timer, so concurrent calls can share the operation name
+                with self.perf_tracker.timer("bedrock_api_call"):
+                    response_body = await loop.run_in_executor(self._executor, self._invoke_model_sync, body)
             
-            duration = self.perf_tracker.end_timer("bedrock_api_call")
+            duration = self.perf_tracker.get_timing("bedrock_api_call")
             self.logger.info(f"Bedrock API call took: {self.perf_tracker.format_duration(duration)}")
             
-            response_body = json.loads(response['body'].read())
+            usage = response_body.get('usage', {})
+            self.logger.info(
+                f"Prompt cache: {usage.get('cache_read_input_tokens', 0)} tokens read, "
+                f"{usage.get('cache_creation_input_tokens', 0)} tokens written"
+            )
             
             if 'content' in response_body and len(response_body['content']) > 0:
                 response_text = response_body['content'][0]['text']
@@ -304,16 +708,24 @@ class BedrockQuestionExtractor:
                 raise Exception("No content in Bedrock response")
                 
         except ClientError as e:
-            self.perf_tracker.end_timer("bedrock_api_call")
             self.logger.error(f"AWS ClientError: {e}")
             raise
         except Exception as e:
-            self.perf_tracker.end_timer("bedrock_api_call")
             self.logger.error(f"Bedrock invocation error: {e}")
             raise
     
+    def _invoke_model_sync(self, body) -> Dict[str, Any]:
+        """Blocking InvokeModel call; returns the decoded response body"""
+        response = self.bedrock_runtime.invoke_model(
+            modelId=self.model_id,
+            body=body,
+            contentType='application/json'
+        )
+        return loads_json(response['body'].read())
+    
     def _parse_bedrock_response(self, response_text: str, method: str) -> Dict[str, Any]:
         """Parse and process Bedrock AI response (XML first, JSON fallback)"""
+        raw_response = self._truncate_raw_response(response_text)
         
         try:
             # Try XML parsing first (ultra-compact format)
@@ -322,28 +734,29 @@ class BedrockQuestionExtractor:
                 parsed_response = self._try_parse_xml(response_text, method)
                 if parsed_response:
                     parsed_response['success'] = True
-                    parsed_response['raw_response'] = response_text
+                    parsed_response['raw_response'] = raw_response
                     return parsed_response
             
             # Fallback to JSON if XML not found
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
+            # From the first "{" to the last "}" after it
+            _, open_brace, after_open = response_text.partition('{')
+            json_body, close_brace, _ = after_open.rpartition('}')
             
-            if json_start >= 0 and json_end > json_start:
+            if open_brace and close_brace:
                 self.logger.info("Attempting JSON parsing...")
-                json_text = response_text[json_start:json_end]
+                json_text = '{' + json_body + '}'
                 
                 parsed_response = self._try_parse_json(json_text, method)
                 if parsed_response:
                     parsed_response['success'] = True
-                    parsed_response['raw_response'] = response_text
+                    parsed_response['raw_response'] = raw_response
                     return parsed_response
                 else:
                     return {
                         "extraction_method": method,
                         "success": False,
                         "error": "Could not parse JSON from response after multiple attempts",
-                        "raw_response": response_text,
+                        "raw_response": raw_response,
                         "total_questions_found": 0,
                         "questions": []
                     }
@@ -352,7 +765,7 @@ class BedrockQuestionExtractor:
                     "extraction_method": method,
                     "success": False,
                     "error": "Could not find JSON or XML structure in response",
-                    "raw_response": response_text,
+                    "raw_response": raw_response,
                     "total_questions_found": 0,
                     "questions": []
                 }
@@ -363,47 +776,42 @@ class BedrockQuestionExtractor:
                 "extraction_method": method,
                 "success": False,
                 "error": f"Unexpected parsing error: {str(e)}",
-                "raw_response": response_text,
+                "raw_response": raw_response,
                 "total_questions_found": 0,
                 "questions": []
             }
     
+    def _truncate_raw_response(self, response_text: str) -> str:
+        """Raw response as stored in the results: capped at RAW_RESPONSE_MAX_CHARS unless keep_raw is set"""
+        if self.keep_raw or len(response_text) <= RAW_RESPONSE_MAX_CHARS:
+            return response_text
+        return response_text[:RAW_RESPONSE_MAX_CHARS] + f"... [truncated {len(response_text) - RAW_RESPONSE_MAX_CHARS} chars]"
+    
     def _try_parse_xml(self, response_text: str, method: str) -> Optional[Dict[str, Any]]:
         """Parse ultra-compact XML format"""
         try:
-            from bs4 import BeautifulSoup
-            
             # Extract XML (handle incomplete responses)
-            xml_start = response_text.find('<questions>')
-            xml_end = response_text.rfind('</questions>')
-            
-            if xml_start < 0:
+            _, open_tag, after_open = response_text.partition('<questions>')
+            if not open_tag:
                 return None
             
+            xml_body, close_tag, _ = after_open.rpartition('</questions>')
             # If incomplete, close the tag
-            if xml_end < 0:
+            if not close_tag:
                 self.logger.warning("Incomplete XML - attempting recovery")
-                xml_text = response_text[xml_start:] + '</questions>'
-            else:
-                xml_text = response_text[xml_start:xml_end + len('</questions>')]
+                xml_body = after_open
+            xml_text = '<questions>' + xml_body + '</questions>'
             
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(xml_text, 'xml')
-            questions_tag = soup.find('questions')
+            try:
+                questions = self._iterparse_questions(xml_text)
+            except ET.ParseError as e:
+                # Truncated tags or unescaped "&" etc.: BeautifulSoup recovers what it can
+                self.logger.warning(f"Malformed XML ({e}) - falling back to BeautifulSoup")
+                questions = self._soup_parse_questions(xml_text)
             
-            if not questions_tag:
+            if questions is None:
                 return None
             
-            questions = []
-            for q in questions_tag.find_all('q'):
-                question_text = q.get_text(strip=True)
-                question_type = q.get('type', 'open_ended')
-                
-                questions.append({
-                    "question_text": question_text,
-                    "question_type": question_type
-                })
-            
             self.logger.info(f"XML parsing successful: {len(questions)} questions extracted")
             return {
                 "extraction_method": method,
@@ -415,19 +823,49 @@ class BedrockQuestionExtractor:
             self.logger.error(f"XML parsing error: {e}")
             return None
     
-    def _clean_json_text(self, json_text: str) -> str:
-        """Clean JSON text from control characters and invalid sequences"""
-        import re
+    @staticmethod
+    def _iterparse_questions(xml_text: str) -> List[Dict[str, str]]:
+        """Stream <q> elements with ElementTree, clearing each once read"""
+        questions = []
+        for _, elem in ET.iterparse(StringIO(xml_text), events=('end',)):
+            if elem.tag == 'q':
+                questions.append({
+                    "question_text": "".join(elem.itertext()).strip(),
+                    "question_type": elem.get('type', 'open_ended')
+                })
+                elem.clear()
+        return questions
+    
+    @staticmethod
+    def _soup_parse_questions(xml_text: str) -> Optional[List[Dict[str, str]]]:
+        """Lenient BeautifulSoup parse for XML that ElementTree rejects"""
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(xml_text, 'xml')
+        questions_tag = soup.find('questions')
         
-        # Remove only problematic control characters, but preserve valid JSON structure
-        # Remove control characters except newlines, tabs, and carriage returns
-        json_text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', json_text)
+        if not questions_tag:
+            return None
         
+        questions = []
+        for q in questions_tag.find_all('q'):
+            questions.append({
+                "question_text": q.get_text(strip=True),
+                "question_type": q.get('type', 'open_ended')
+            })
+        return questions
+    
+    def _clean_json_text(self, json_text: str) -> str:
+        """Clean JSON text from control characters and invalid sequences"""
+        # Remove only problematic control characters, but preserve valid JSON structure:
+        # control characters except newlines, tabs and carriage returns, and the
+        # non-printable \x80-\x9F range
         # Don't escape newlines and other characters that are already properly escaped in JSON
         # The JSON is already properly formatted from Bedrock
-        
-        # Remove any non-printable characters that might cause issues
-        json_text = re.sub(r'[\x80-\x9F]', '', json_text)
+        if json_text.isascii():
+            json_text = json_text.translate(JSON_CONTROL_CHARS_TABLE)
+        else:
+            json_text = JSON_CONTROL_CHARS_RE.sub('', json_text)
         
         # Clean up any double escaping issues
         json_text = json_text.replace('\\\\n', '\\n')
@@ -444,45 +882,40 @@ class BedrockQuestionExtractor:
         
         # Approach 1: Parse as-is
         try:
-            return json.loads(json_text)
+            return loads_json(json_text)
         except json.JSONDecodeError as e:
             self.logger.debug(f"Approach 1 failed for {method}: {str(e)}")
         
         # Approach 2: Clean and parse
         try:
             cleaned_json = self._clean_json_text(json_text)
-            return json.loads(cleaned_json)
+            return loads_json(cleaned_json)
         except json.JSONDecodeError as e:
             self.logger.debug(f"Approach 2 failed for {method}: {str(e)}")
         
-        # Approach 3: Try to fix common JSON issues
+        # Approach 3: Allow raw control characters (e.g. unescaped newlines) inside strings
         try:
-            # Fix unescaped quotes in strings
-            import re
-            fixed_json = re.sub(r'(?<!\\)"(?=.*")', '\\"', json_text)
-            return json.loads(fixed_json)
+            return LENIENT_JSON_DECODER.decode(json_text)
         except json.JSONDecodeError as e:
             self.logger.debug(f"Approach 3 failed for {method}: {str(e)}")
         
         # Approach 4: Try to extract just the structure we need
         try:
-            import re
             # Look for the main structure patterns
             if '"total_questions_found"' in json_text and '"questions"' in json_text:
                 # Try to manually extract key information
-                total_match = re.search(r'"total_questions_found":\s*(\d+)', json_text)
+                total_match = TOTAL_QUESTIONS_RE.search(json_text)
                 if total_match:
                     total_questions = int(total_match.group(1))
                     
                     # Try to extract questions array manually
-                    questions_match = re.search(r'"questions":\s*\[(.*?)\]', json_text, re.DOTALL)
+                    questions_match = QUESTIONS_ARRAY_RE.search(json_text)
                     questions = []
                     
                     if questions_match:
                         questions_text = questions_match.group(1)
                         # Try to parse individual question objects
-                        question_pattern = r'\{[^{}]*"question_text"[^{}]*\}'
-                        question_matches = re.findall(question_pattern, questions_text)
+                        question_matches = QUESTION_OBJECT_RE.findall(questions_text)
                         
                         for q_match in question_matches:
                             try:
@@ -490,7 +923,7 @@ class BedrockQuestionExtractor:
                                 questions.append(q_obj)
                             except:
                                 # If individual question parsing fails, create a basic structure
-                                text_match = re.search(r'"question_text":\s*"([^"]*)"', q_match)
+                                text_match = QUESTION_TEXT_RE.search(q_match)
                                 if text_match:
                                     questions.append({
                                         "question_text": text_match.group(1),
@@ -513,17 +946,10 @@ class BedrockQuestionExtractor:
         
         # Approach 5: Try to find any question-like text and create minimal structure
         try:
-            import re
             # Look for any question patterns in the text
-            question_patterns = [
-                r'["\']([^"\']*\?[^"\']*)["\']',  # Text ending with ?
-                r'["\']([^"\']*(?:what|how|when|where|why|which|who)[^"\']*)["\']',  # Question words
-                r'["\']([^"\']*(?:please|rate|describe|provide)[^"\']*)["\']',  # Instruction words
-            ]
-            
             found_questions = []
-            for pattern in question_patterns:
-                matches = re.findall(pattern, json_text, re.IGNORECASE)
+            for pattern in QUESTION_LIKE_RES:
+                matches = pattern.findall(json_text)
                 for match in matches:
                     if len(match.strip()) > 10:  # Only meaningful questions
                         found_questions.append({
@@ -555,16 +981,19 @@ class BedrockQuestionExtractor:
 class POCRunner:
     """Run POC and compare results"""
     
-    def __init__(self):
+    def __init__(self, use_cache: bool = True, keep_raw: bool = False):
         self.logger = logging.getLogger(__name__)
-        self.text_extractor = ExcelTextExtractor()
+        markitdown_cache = MARKITDOWN_CACHE_DIR if use_cache and not os.environ.get('AQE_NO_CACHE') else None
+        self.text_extractor = ExcelTextExtractor(cache_dir=markitdown_cache)
         self.perf_tracker = PerformanceTracker()
         
         # AWS configuration
         region = os.getenv('AWS_REGION', 'us-west-2')
         model_id = os.getenv('BEDROCK_MODEL_ID', 'arn:aws:bedrock:us-west-2:492490406854:inference-profile/global.anthropic.claude-sonnet-4-20250514-v1:0')
         
-        self.bedrock_extractor = BedrockQuestionExtractor(region=region, model_id=model_id)
+        cache = LLMCache() if use_cache else None
+        self.bedrock_extractor = BedrockQuestionExtractor(region=region, model_id=model_id, cache=cache,
+                                                          keep_raw=keep_raw)
     
     async def run_poc(self, excel_file_path: str, selected_approaches: List[int] = None) -> Dict[str, Any]:
         """Run complete POC with selected approaches"""
@@ -595,6 +1024,32 @@ class POCRunner:
         
         return results
     
+    async def run_poc_batch(self, paths: List[str], concurrency: int = BATCH_CONCURRENCY,
+                            selected_approaches: List[int] = None) -> List[Dict[str, Any]]:
+        """Run the POC over several files, at most `concurrency` at a time, so their Bedrock calls overlap"""
+        sem = asyncio.Semaphore(concurrency)
+        outcomes = await asyncio.gather(
+            *[self._bounded(sem, path, selected_approaches) for path in paths],
+            return_exceptions=True
+        )
+        
+        batch_results = []
+        for path, outcome in zip(paths, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"POC failed for {path}: {outcome}")
+                outcome = {"excel_file": path, "error": str(outcome), "approaches": {}}
+            batch_results.append(outcome)
+        return batch_results
+    
+    async def _bounded(self, sem: asyncio.Semaphore, path: str, selected_approaches: List[int] = None) -> Dict[str, Any]:
+        """Run one file of a batch once a semaphore slot is free"""
+        async with sem:
+            # Timers are keyed by operation name, so each file gets its own tracker;
+            # the extractors (and the Bedrock client) are shared
+            runner = copy.copy(self)
+            runner.perf_tracker = PerformanceTracker()
+            return await runner.run_poc(path, selected_approaches)
+    
     async def _run_approach_3(self, results: Dict[str, Any], excel_file_path: str, 
                              markitdown_text: str = None, markitdown_file: str = None) -> tuple:
         """Run Approach 3: Excel -> MarkItDown -> Bedrock"""
@@ -603,7 +1058,11 @@ class POCRunner:
         
         try:
             if markitdown_text is None:
-                markitdown_text = self.text_extractor.extract_markitdown_text(excel_file_path, self.perf_tracker)
+                # Conversion is CPU-bound and blocking: run it in a worker thread so
+                # other files of a batch keep making progress meanwhile
+                markitdown_text = await asyncio.to_thread(
+                    self.text_extractor.extract_markitdown_text, excel_file_path, self.perf_tracker
+                )
                 self.logger.info(f"MarkItDown text extracted: {len(markitdown_text)} characters")
             else:
                 self.logger.info(f"Reusing MarkItDown text: {len(markitdown_text)} characters")
@@ -654,12 +1113,20 @@ class POCRunner:
         markitdown_file = f"{excel_name}_markitdown_{timestamp}.md"
         
         try:
-            with open(markitdown_file, 'w', encoding='utf-8') as f:
-                f.write(f"# MarkItDown Extraction from {excel_file_path}\n\n")
-                f.write(f"**Extracted at:** {datetime.now().isoformat()}\n")
-                f.write(f"**Source file:** {excel_file_path}\n")
-                f.write(f"**Text length:** {len(markitdown_text)} characters\n\n")
-                f.write("---\n\n")
+            header = "\n".join([
+                f"# MarkItDown Extraction from {excel_file_path}",
+                "",
+                f"**Extracted at:** {datetime.now().isoformat()}",
+                f"**Source file:** {excel_file_path}",
+                f"**Text length:** {len(markitdown_text)} characters",
+                "",
+                "---",
+                "",
+                ""
+            ])
+            # Large buffer: header and text go out in a few big writes
+            with open(markitdown_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write(header)
                 f.write(markitdown_text)
             
             self.logger.info(f"MarkItDown text saved to: {markitdown_file}")
@@ -676,108 +1143,200 @@ class POCRunner:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = f"excel_extraction_poc_results_{timestamp}.json"
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        # default=str: values neither encoder knows natively are written as strings
+        if ORJSON_AVAILABLE:
+            with open(output_file, 'wb') as f:
+                self._write_json_streamed(f, results)
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False, default=str)
         
         self.logger.info(f"Results saved to: {output_file}")
         return output_file
+    
+    @staticmethod
+    def _write_json_streamed(f, results: Dict[str, Any]) -> None:
+        """Write results as indented JSON one top-level value at a time.
+        
+        Only one subtree is serialized in memory at once; the output is the same as
+        orjson.dumps(results) with OPT_INDENT_2.
+        """
+        def dumps(value) -> bytes:
+            return orjson.dumps(value, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        
+        if not results:
+            f.write(b'{}')
+            return
+        
+        f.write(b'{')
+        for index, (key, value) in enumerate(results.items()):
+            f.write(b',\n  ' if index else b'\n  ')
+            # Nested one level deeper than a standalone dump: indent every line by 2 more spaces
+            f.write(dumps(str(key)) + b': ' + dumps(value).replace(b'\n', b'\n  '))
+        f.write(b'\n}')
+
+
+async def run_batch(poc_runner: POCRunner, batch_dir: str, concurrency: int,
+                    selected_approaches: List[int], output_file: str = None) -> None:
+    """Run the POC over every Excel file in a directory and save one combined results file"""
+    
+    paths = sorted({str(p) for pattern in BATCH_FILE_PATTERNS for p in Path(batch_dir).glob(pattern)})
+    if not paths:
+        raise FileNotFoundError(f"No Excel files found in: {batch_dir}")
+    
+    logger.info(f"Starting batch of {len(paths)} files with concurrency {concurrency}")
+    start = time.perf_counter()
+    batch_results = await poc_runner.run_poc_batch(paths, max(1, concurrency), selected_approaches)
+    duration = time.perf_counter() - start
+    
+    output_file = poc_runner.save_results({
+        "batch_dir": batch_dir,
+        "timestamp": datetime.now().isoformat(),
+        "total_time": duration,
+        "results": batch_results
+    }, output_file)
+    
+    lines = []
+    lines.append("\n" + "="*60)
+    lines.append(f"BATCH RESULTS SUMMARY ({len(paths)} files in {poc_runner.perf_tracker.format_duration(duration)})")
+    lines.append("="*60)
+    
+    for results in batch_results:
+        lines.append(f"\n{results['excel_file']}:")
+        if "error" in results:
+            lines.append(f"  ❌ Error: {results['error']}")
+        for approach_name, approach_data in results["approaches"].items():
+            bedrock_result = approach_data.get("bedrock_result", {})
+            if bedrock_result.get("success"):
+                lines.append(f"  ✅ {approach_name}: {bedrock_result.get('total_questions_found', 0)} questions found")
+            else:
+                error = approach_data.get("error") or bedrock_result.get("error", "Unknown error")
+                lines.append(f"  ❌ {approach_name}: {error}")
+    
+    lines.append(f"\n📄 Full results saved to: {output_file}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 async def main():
     """Main function"""
     
     parser = argparse.ArgumentParser(description='Excel Question Extraction POC')
-    parser.add_argument('excel_file', help='Path to Excel file to analyze')
+    parser.add_argument('excel_file', nargs='?', help='Path to Excel file to analyze')
+    parser.add_argument('--batch', metavar='DIR', help='Analyze every Excel file in DIR instead of a single file')
+    parser.add_argument('--concurrency', type=int, default=BATCH_CONCURRENCY,
+                        help=f'Files processed concurrently with --batch (default: {BATCH_CONCURRENCY})')
     parser.add_argument('--output', '-o', help='Output JSON file path')
+    parser.add_argument('--keep-raw', action='store_true',
+                        help=f'Keep full raw Bedrock responses in the results (default: first {RAW_RESPONSE_MAX_CHARS} characters)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always convert and call Bedrock instead of reusing cached MarkItDown text and '
+                             'responses (response TTL: LLM_CACHE_TTL_DAYS, default 7)')
     
     args = parser.parse_args()
     
-    if not args.excel_file:
+    if not args.excel_file and not args.batch:
         parser.print_help()
         sys.exit(1)
     
+    # Fail fast, before MarkItDown/boto3 are imported and the Bedrock client is built
+    if args.batch:
+        if not os.path.isdir(args.batch):
+            parser.error(f"Batch directory not found: {args.batch}")
+    elif not os.path.isfile(args.excel_file):
+        parser.error(f"Excel file not found: {args.excel_file}")
+    
     # Always use approach 3 (MarkItDown + InvokeModel)
     selected_approaches = [3]
     
     try:
         # Run POC
-        poc_runner = POCRunner()
+        poc_runner = POCRunner(use_cache=not args.no_cache, keep_raw=args.keep_raw)
+        
+        if args.batch:
+            await run_batch(poc_runner, args.batch, args.concurrency, selected_approaches, args.output)
+            return
+        
         results = await poc_runner.run_poc(args.excel_file, selected_approaches)
         
         # Save results
         output_file = poc_runner.save_results(results, args.output)
         
-        # Print summary
-        print("\n" + "="*60)
-        print("POC RESULTS SUMMARY")
-        print("="*60)
+        # Print summary: collected and written to stdout in one call
+        lines = []
+        lines.append("\n" + "="*60)
+        lines.append("POC RESULTS SUMMARY")
+        lines.append("="*60)
         
         performance_data = []
         
         for approach_name, approach_data in results["approaches"].items():
-            print(f"\n{approach_name.upper()}:")
-            if "error" in approach_data:
-                print(f"  ❌ Error: {approach_data['error']}")
-            elif "bedrock_result" in approach_data:
-                bedrock_result = approach_data["bedrock_result"]
-                success = bedrock_result.get("success", False)
-                questions_count = bedrock_result.get("total_questions_found", 0)
-                
-                if success:
-                    print(f"  ✅ Success: {questions_count} questions found")
+            # A malformed approach entry is logged and skipped, the rest is still summarized
+            try:
+                lines.append(f"\n{approach_name.upper()}:")
+                if "error" in approach_data:
+                    lines.append(f"  ❌ Error: {approach_data['error']}")
+                elif "bedrock_result" in approach_data:
+                    bedrock_result = approach_data["bedrock_result"]
+                    success = bool(bedrock_result.get("success", False))
+                    questions_count = bedrock_result.get("total_questions_found", 0) if success else 0
+                    perf = approach_data.get("performance")
                     
-                    # Print first few questions
-                    questions = bedrock_result.get("questions", [])
-                    for i, q in enumerate(questions[:3]):
-                        print(f"    {i+1}. {q.get('question_text', 'N/A')[:60]}...")
-                    
-                    if len(questions) > 3:
-                        print(f"    ... and {len(questions) - 3} more questions")
+                    if success:
+                        lines.append(f"  ✅ Success: {questions_count} questions found")
                         
-                    # Print performance metrics
-                    if "performance" in approach_data:
-                        perf = approach_data["performance"]
-                        print(f"  ⏱️  Total Time: {perf.get('total_formatted', 'N/A')}")
+                        # Print first few questions
+                        questions = bedrock_result.get("questions", [])
+                        listed_count = len(questions)
+                        for i, q in enumerate(islice(questions, 3), 1):
+                            lines.append(f"    {i}. {q.get('question_text', 'N/A')[:60]}...")
                         
-                        # Store for comparison
-                        performance_data.append({
-                            "approach": approach_name,
-                            "total_time": perf.get("total_time", 0),
-                            "questions_found": questions_count,
-                            "success": True
-                        })
-                    
-                else:
-                    print(f"  ❌ Failed: {bedrock_result.get('error', 'Unknown error')}")
+                        if listed_count > 3:
+                            lines.append(f"    ... and {listed_count - 3} more questions")
+                        
+                        # Print performance metrics
+                        if perf is not None:
+                            lines.append(f"  ⏱️  Total Time: {perf.get('total_formatted', 'N/A')}")
+                    else:
+                        lines.append(f"  ❌ Failed: {bedrock_result.get('error', 'Unknown error')}")
                     
-                    if "performance" in approach_data:
-                        perf = approach_data["performance"]
+                    # Store for comparison
+                    if perf is not None:
+                        total_time = perf.get("total_time", 0)
                         performance_data.append({
                             "approach": approach_name,
-                            "total_time": perf.get("total_time", 0),
-                            "questions_found": 0,
-                            "success": False
+                            "total_time": total_time,
+                            "formatted": perf.get("total_formatted") or poc_runner.perf_tracker.format_duration(total_time),
+                            "questions_found": questions_count,
+                            "success": success
                         })
-                    
+            except Exception:
+                logger.exception("Summary failed for approach %s", approach_name)
+                continue
         
         # Performance comparison
         if len(performance_data) > 1:
-            print(f"\n⚡ PERFORMANCE COMPARISON:")
-            performance_data.sort(key=lambda x: x["total_time"])
+            lines.append(f"\n⚡ PERFORMANCE COMPARISON:")
+            fastest = min(performance_data, key=lambda x: x["total_time"])
+            others = sorted((p for p in performance_data if p is not fastest), key=lambda x: x["total_time"])
+            lines.append(f"  🏆 Fastest: {fastest['approach']} ({fastest['formatted']})")
             
-            fastest = performance_data[0]
-            print(f"  🏆 Fastest: {fastest['approach']} ({poc_runner.perf_tracker.format_duration(fastest['total_time'])})")
-            
-            for i, perf in enumerate(performance_data[1:], 1):
+            for i, perf in enumerate(others, 1):
                 speedup = perf["total_time"] / fastest["total_time"] if fastest["total_time"] > 0 else 1
-                print(f"  #{i+1}: {perf['approach']} ({poc_runner.perf_tracker.format_duration(perf['total_time'])}) - {speedup:.1f}x slower")
+                lines.append(f"  #{i+1}: {perf['approach']} ({perf['formatted']}) - {speedup:.1f}x slower")
         
-        print(f"\n📄 Full results saved to: {output_file}")
+        lines.append(f"\n📄 Full results saved to: {output_file}")
+        sys.stdout.write("\n".join(lines) + "\n")
              
-    except Exception as e:
-        logger.error(f"POC failed: {e}")
+    except Exception:
+        logger.exception("POC failed")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop (optional) is a faster drop-in event loop; asyncio.run otherwise
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())